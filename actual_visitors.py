@@ -4,10 +4,13 @@ from datetime import datetime, timedelta
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 import warnings
 import traceback
+from holiday_calendar import get_calendar
+from prediction_intervals import prediction_interval, quantile_bands, simulate_paths
+from calibration import load_scaling_table
 warnings.filterwarnings('ignore')
 
 class VisitorPredictor:
-    def __init__(self):
+    def __init__(self, seed=None, interval_paths=2000, interval_coverage=0.8):
         self.peak_seasons = {
             11: 'winter_peak', 12: 'winter_peak', 1: 'winter_peak',
             6: 'summer_peak', 7: 'summer_peak',
@@ -66,7 +69,22 @@ class VisitorPredictor:
         }
         
         self.maha_kumbh_years = [2001, 2013, 2025, 2037, 2049]
+        self.calendar = get_calendar()
+        self.holiday_factor = 1.2
+        # Simulation settings for the prediction intervals
+        self.seed = seed
+        self.interval_paths = interval_paths
+        self.interval_coverage = interval_coverage
         self.model = None
+        # Per-month factors fitted from recorded visitor counts (calibration.py)
+        self.calibrated_scaling = load_scaling_table()
+
+    def scaling_factor(self, place_name, month):
+        """Visitors per 100 trend points: the calibrated value for the month, else the place constant."""
+        calibrated = self.calibrated_scaling.get((place_name, month))
+        if calibrated is not None:
+            return calibrated
+        return self.scaling_factors.get(place_name, 500)
         
     def load_and_predict(self, filename, place_name):
         try:
@@ -97,11 +115,15 @@ class VisitorPredictor:
             return None
         
     def _train_prediction_model(self, values):
+        self.model = self._fit_model(values)
+
+    def _fit_model(self, values):
+        """Holt-Winters fit of one place's series, or None if it cannot be fitted."""
         try:
             if len(values) < 12:
                 raise ValueError("Insufficient data points for seasonal modeling. Provide at least 12 data points.")
             
-            self.model = ExponentialSmoothing(
+            return ExponentialSmoothing(
                 values,
                 seasonal_periods=4,
                 trend='add',
@@ -111,56 +133,96 @@ class VisitorPredictor:
         except Exception as e:
             print("Error in training model:")
             print(traceback.format_exc())
-            self.model = None
+            return None
         
+    def load_and_predict_all(self, filename, place_names=None):
+        """Forecast several places at once, simulating all interval paths in one vectorized draw."""
+        df = pd.read_csv(filename)
+        if 'Week' not in df.columns:
+            raise ValueError("Date column 'Week' not found in the CSV.")
+        df['Week'] = pd.to_datetime(df['Week'], format='%d-%m-%Y', errors='coerce')
+        df = df.dropna(subset=['Week']).sort_values('Week').set_index('Week')
+        place_names = place_names or df.columns.tolist()
+
+        models, last_dates = {}, {}
+        for place_name in place_names:
+            values = pd.to_numeric(df[place_name], errors='coerce').dropna()
+            model = self._fit_model(values)
+            if model is not None:
+                models[place_name] = model
+                last_dates[place_name] = values.index.max()
+
+        if not models:
+            return {}
+        point_forecasts = np.array([np.asarray(model.forecast(4)) for model in models.values()])
+        paths = simulate_paths(point_forecasts, [np.asarray(model.resid) for model in models.values()],
+                               n_paths=self.interval_paths, seed=self.seed)
+        lower, upper = quantile_bands(paths, self.interval_coverage)
+
+        return {
+            place_name: self._build_predictions(place_name, last_dates[place_name],
+                                                point_forecasts[row], lower[row], upper[row])
+            for row, place_name in enumerate(models)
+        }
+
     def predict_visitors(self, place_name, last_date):
         try:
             if self.model is None:
                 raise ValueError("Model has not been trained successfully.")
             
-            predicted_values = self.model.forecast(4)
+            predicted_values = np.asarray(self.model.forecast(4))
             
             if len(predicted_values) == 0:
                 raise ValueError("Forecasting returned an empty result.")
             
-            predictions = []
-            for i, pred_gtrends in enumerate(predicted_values):
-                pred_gtrends = max(0, pred_gtrends)
-                predicted_week = last_date + timedelta(weeks=i+1)
-                
-                current_month = predicted_week.month
-                current_year = predicted_week.year
-                current_season = self.peak_seasons.get(current_month, 'regular')
-                seasonal_factor = self.seasonal_factors[current_season]
-                adjusted_ratio = 1.0 * seasonal_factor
-                
-                scaling_factor = self.scaling_factors.get(place_name, 500)
-                
-                if place_name == "Maha Kumbh" and current_year not in self.maha_kumbh_years:
-                    predicted_visitors_actual = 0
-                else:
-                    predicted_visitors_normalized = pred_gtrends / adjusted_ratio
-                    predicted_visitors_actual = predicted_visitors_normalized * scaling_factor / 100
-                
-                confidence_interval = {
-                    'lower': max(0, predicted_visitors_actual * 0.8),
-                    'upper': predicted_visitors_actual * 1.2
-                }
-                
-                predictions.append({
-                    'predicted_week': predicted_week.strftime("%d-%m-%Y"),
-                    'predicted_gtrends': pred_gtrends,
-                    'predicted_visitors_actual': int(predicted_visitors_actual),
-                    'confidence_interval': confidence_interval
-                })
-            
-            return predictions
+            lower, upper = prediction_interval(predicted_values, np.asarray(self.model.resid),
+                                               coverage=self.interval_coverage,
+                                               n_paths=self.interval_paths, seed=self.seed)
+            return self._build_predictions(place_name, last_date, predicted_values, lower, upper)
         
         except Exception as e:
             print("Error in forecasting:")
             print(traceback.format_exc())
             return None
 
+    def _build_predictions(self, place_name, last_date, predicted_values, lower, upper):
+        predicted_weeks = [last_date + timedelta(weeks=i+1) for i in range(len(predicted_values))]
+        holiday_weeks = self.calendar.holiday_in_week(predicted_weeks, region=self.calendar.region_for(place_name))
+        
+        predictions = []
+        for i, pred_gtrends in enumerate(predicted_values):
+            pred_gtrends = max(0, pred_gtrends)
+            predicted_week = predicted_weeks[i]
+            
+            current_month = predicted_week.month
+            current_year = predicted_week.year
+            current_season = self.peak_seasons.get(current_month, 'regular')
+            seasonal_factor = self.seasonal_factors[current_season]
+            adjusted_ratio = 1.0 * seasonal_factor
+            
+            # Visitors per Google Trends point for this week; also maps the interval bounds.
+            if place_name == "Maha Kumbh" and current_year not in self.maha_kumbh_years:
+                visitors_per_point = 0
+            else:
+                visitors_per_point = self.scaling_factor(place_name, current_month) / 100 / adjusted_ratio
+                if holiday_weeks[i]:
+                    visitors_per_point *= self.holiday_factor
+            predicted_visitors_actual = pred_gtrends * visitors_per_point
+            
+            confidence_interval = {
+                'lower': max(0, lower[i]) * visitors_per_point,
+                'upper': max(0, upper[i]) * visitors_per_point
+            }
+            
+            predictions.append({
+                'predicted_week': predicted_week.strftime("%d-%m-%Y"),
+                'predicted_gtrends': pred_gtrends,
+                'predicted_visitors_actual': int(predicted_visitors_actual),
+                'confidence_interval': confidence_interval
+            })
+        
+        return predictions
+
 def main():
     predictor = VisitorPredictor()
     place_name = input("Enter the location name: ")
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import date, datetime
+
+from aiohttp import web
+
+from crowd_index import MAX_HORIZON_WEEKS
+from forecast_jobs import ForecastCancelled, ForecastJobManager
+from tourism_recommendation import RANGE_FIELDS, TourismRecommender
+
+CATALOG_FILE = "tour_packages.json"
+TRENDS_FILE = "Google_Trends_past_5.csv"
+MAX_LIMIT = 200
+MAX_BATCH = 50
+
+RECOMMENDER = web.AppKey("recommender", TourismRecommender)
+FORECASTS = web.AppKey("forecasts", ForecastJobManager)
+STATS = web.AppKey("stats", dict)
+TRENDS = web.AppKey("trends_file", str)
+
+logger = logging.getLogger("api_server")
+
+
+class BadRequest(ValueError):
+    """A request the client has to fix; answered with HTTP 400."""
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()  # numpy scalars
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps(data):
+    return json.dumps(data, default=_json_default, ensure_ascii=False)
+
+
+def json_response(data, status=200):
+    return web.json_response(data, status=status, dumps=dumps)
+
+
+def _parse_date(name, value):
+    if not isinstance(value, str):
+        raise BadRequest(f"'{name}' dates must be YYYY-MM-DD strings.")
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise BadRequest(f"'{name}' has an invalid date: {value!r}.")
+
+
+def parse_preferences(raw):
+    """Search preferences from a JSON object; range preferences arrive as [low, high] lists, dates as ISO strings."""
+    if raw is None:
+        return {}
+    if not isinstance(raw, dict):
+        raise BadRequest("'preferences' must be an object.")
+    preferences = dict(raw)
+    for name in list(RANGE_FIELDS) + ["travel_window"]:
+        value = preferences.get(name)
+        if value is None:
+            continue
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise BadRequest(f"'{name}' must be a [low, high] pair.")
+        preferences[name] = tuple(value)
+    if preferences.get("travel_window"):
+        preferences["travel_window"] = tuple(_parse_date("travel_window", value)
+                                             for value in preferences["travel_window"])
+    if preferences.get("crowd_week"):
+        preferences["crowd_week"] = _parse_date("crowd_week", preferences["crowd_week"])
+    return preferences
+
+
+def run_search(recommender, body):
+    location = body.get("location")
+    if not isinstance(location, str) or not location.strip():
+        raise BadRequest("'location' is required.")
+    try:
+        limit = min(int(body.get("limit", 20)), MAX_LIMIT)
+        offset = max(int(body.get("offset", 0)), 0)
+    except (TypeError, ValueError):
+        raise BadRequest("'limit' and 'offset' must be integers.")
+    results = recommender.search_packages(location, parse_preferences(body.get("preferences")))
+    return {
+        "location": location,
+        "count": len(results),
+        "offset": offset,
+        "results": [pkg.to_dict() for pkg in results[offset:offset + limit]]
+    }
+
+
+async def run_search_async(recommender, body):
+    """run_search on the default thread pool, so a slow search does not hold up the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, run_search, recommender, body)
+
+
+def facets(recommender):
+    """Filter values and numeric bounds for building search forms."""
+    data = dict(recommender.get_unique_values())
+    data["ranges"] = recommender.range_bounds()
+    return data
+
+
+async def run_forecast(app, body):
+    place = body.get("place")
+    if not isinstance(place, str) or not place.strip():
+        raise BadRequest("'place' is required.")
+    start = body.get("start")  # None: the week after the trends data ends
+    if start is not None:
+        try:
+            datetime.strptime(start, "%d-%m-%Y")
+        except (TypeError, ValueError):
+            raise BadRequest("'start' must be a dd-mm-YYYY date.")
+    steps = body.get("steps", 4)
+    if not isinstance(steps, int) or not 1 <= steps <= MAX_HORIZON_WEEKS:
+        raise BadRequest(f"'steps' must be between 1 and {MAX_HORIZON_WEEKS}.")
+
+    # Identical forecasts share one model fit and are served from the job cache while fresh.
+    # The trends file is server configuration; clients never choose what gets read.
+    filename = app[TRENDS]
+    key = (filename, place, start, steps)
+    from arima1 import PAST_WEEKS, VisitorPredictor  # statsmodels is only loaded once a forecast is asked for
+    predictor = VisitorPredictor()
+    try:
+        job = app[FORECASTS].submit(key, predictor.predict, filename, place, start, steps=steps)
+    except RuntimeError as e:
+        raise web.HTTPServiceUnavailable(text=dumps({"error": str(e)}), content_type="application/json")
+    try:
+        weeks, actual, predicted, bands = await asyncio.wrap_future(job.future)
+    except ForecastCancelled:
+        raise web.HTTPServiceUnavailable(text=dumps({"error": "Forecast cancelled."}),
+                                         content_type="application/json")
+    except (KeyError, ValueError) as e:
+        raise BadRequest(f"Forecast failed for '{place}': {e}")
+    return {
+        "place": place,
+        "start": start or weeks[PAST_WEEKS],
+        "weeks": [{"week": week, "actual": a, "predicted": p, "lower": low, "upper": high}
+                  for week, a, p, low, high in zip(weeks, actual, predicted, bands["lower"], bands["upper"])]
+    }
+
+
+async def _read_json(request):
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise BadRequest("Body must be JSON.")
+    if not isinstance(body, dict):
+        raise BadRequest("Body must be a JSON object.")
+    return body
+
+
+@web.middleware
+async def errors_and_timing(request, handler):
+    started = time.perf_counter()
+    stats = request.app[STATS]
+    stats["requests"] += 1
+    try:
+        return await handler(request)
+    except BadRequest as e:
+        stats["errors"] += 1
+        return json_response({"error": str(e)}, status=400)
+    except web.HTTPException:
+        stats["errors"] += 1
+        raise
+    except Exception as e:
+        stats["errors"] += 1
+        logger.exception("%s %s failed: %s", request.method, request.path, e)
+        return json_response({"error": "Internal error."}, status=500)
+    finally:
+        stats["busy_seconds"] += time.perf_counter() - started
+
+
+async def health(request):
+    recommender = request.app[RECOMMENDER]
+    stats = request.app[STATS]
+    return json_response({"status": "ok", "packages": len(recommender.tour_packages),
+                          "requests": stats["requests"], "errors": stats["errors"]})
+
+
+async def search(request):
+    return json_response(await run_search_async(request.app[RECOMMENDER], await _read_json(request)))
+
+
+async def get_facets(request):
+    return json_response(facets(request.app[RECOMMENDER]))
+
+
+async def forecast(request):
+    return json_response(await run_forecast(request.app, await _read_json(request)))
+
+
+async def _batch_item(app, item):
+    """One batch entry as {"ok": ..., "result"/"error": ...}; failures do not sink the batch."""
+    try:
+        if not isinstance(item, dict):
+            raise BadRequest("Batch entries must be objects.")
+        op = item.get("op")
+        if op == "search":
+            result = await run_search_async(app[RECOMMENDER], item)
+        elif op == "facets":
+            result = facets(app[RECOMMENDER])
+        elif op == "forecast":
+            result = await run_forecast(app, item)
+        else:
+            raise BadRequest(f"Unknown op '{op}'; expected search, facets or forecast.")
+        return {"ok": True, "result": result}
+    except BadRequest as e:
+        return {"ok": False, "error": str(e)}
+    except web.HTTPException as e:
+        return {"ok": False, "error": e.text or e.reason}
+    except Exception as e:
+        logger.exception("Batch %s failed: %s", item.get("op") if isinstance(item, dict) else item, e)
+        return {"ok": False, "error": "Internal error."}
+
+
+async def batch(request):
+    """Several operations in one round trip; forecasts in it run concurrently."""
+    body = await _read_json(request)
+    items = body.get("requests")
+    if not isinstance(items, list) or not items:
+        raise BadRequest("'requests' must be a non-empty list.")
+    if len(items) > MAX_BATCH:
+        raise BadRequest(f"At most {MAX_BATCH} requests per batch.")
+    results = await asyncio.gather(*(_batch_item(request.app, item) for item in items))
+    return json_response({"responses": results})
+
+
+async def _shutdown_forecasts(app):
+    app[FORECASTS].shutdown()
+
+
+def create_app(catalog_file=CATALOG_FILE, recommender=None, forecast_workers=2, max_pending_forecasts=32,
+               trends_file=TRENDS_FILE):
+    """The API application; pass `recommender` to serve an already loaded catalog."""
+    app = web.Application(middlewares=[errors_and_timing])
+    app[RECOMMENDER] = recommender or TourismRecommender(catalog_file)
+    app[FORECASTS] = ForecastJobManager(max_workers=forecast_workers, max_pending=max_pending_forecasts)
+    app[STATS] = {"requests": 0, "errors": 0, "busy_seconds": 0.0}
+    app[TRENDS] = trends_file
+    app.router.add_get("/health", health)
+    app.router.add_post("/search", search)
+    app.router.add_get("/facets", get_facets)
+    app.router.add_post("/forecast", forecast)
+    app.router.add_post("/batch", batch)
+    app.on_cleanup.append(_shutdown_forecasts)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON API for package search, facets and visitor forecasts.")
+    parser.add_argument("--catalog", default=CATALOG_FILE, help="Tour package catalog to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--forecast-workers", type=int, default=2, help="Threads fitting forecast models")
+    parser.add_argument("--keepalive", type=float, default=75.0, help="Seconds to hold idle connections open")
+    parser.add_argument("--trends", default=TRENDS_FILE, help="Weekly Google Trends CSV that forecasts are fitted on")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    app = create_app(args.catalog, forecast_workers=args.forecast_workers, trends_file=args.trends)
+    logger.info("Serving %d packages on http://%s:%s", len(app[RECOMMENDER].tour_packages), args.host, args.port)
+    web.run_app(app, host=args.host, port=args.port, keepalive_timeout=args.keepalive, print=None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,72 @@
+import importlib
+import os
+import sys
+import time
+import tracemalloc
 import streamlit as st
 
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
 # ✅ This must be the first Streamlit command
 st.set_page_config(page_title="Tourism AI Suite", layout="wide")
 
-# Import the three modules AFTER set_page_config
-import arima1
-import recommendation_system1
-import seasonal1
+# Feature modules are imported the first time their sidebar option is chosen,
+# so a session only pays for the libraries (statsmodels, plotly, ...) it uses.
+FEATURES = {
+    "Predicting Visitors Using ARIMA": "arima1",
+    "Tourist Package Recommender": "recommendation_system1",
+    "Seasonal Recommendation": "seasonal1"
+}
+# Opened on a cold start; the recommender does not need statsmodels or pandas
+DEFAULT_FEATURE = "Tourist Package Recommender"
+
+# Run with TOURISM_PROFILE_STARTUP=1 to report import time and memory per module
+PROFILE_STARTUP = os.environ.get("TOURISM_PROFILE_STARTUP") == "1"
+
+@st.cache_resource
+def get_import_stats():
+    return {}
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def load_feature(module_name):
+    """Import a feature module on first use, recording its cost in profiling mode."""
+    if module_name in sys.modules or not PROFILE_STARTUP:
+        return importlib.import_module(module_name)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    rss_before = _peak_rss_mb()
+    mem_before = tracemalloc.get_traced_memory()[0]
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    module = importlib.import_module(module_name)
+
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    mem_after, mem_peak = tracemalloc.get_traced_memory()
+    rss_after = _peak_rss_mb()
+    if not tracing:
+        tracemalloc.stop()
+
+    stats = {
+        "import_s": round(wall, 3),
+        "cpu_s": round(cpu, 3),
+        "python_alloc_mb": round((mem_after - mem_before) / (1024 * 1024), 1),
+        "python_peak_mb": round(mem_peak / (1024 * 1024), 1),
+        "peak_rss_growth_mb": round(rss_after - rss_before, 1) if rss_before is not None else None
+    }
+    get_import_stats()[module_name] = stats
+    print(f"⏱️ Imported {module_name}: {stats}")
+    return module
 
 # App title
 st.title("🧳Enhancing Tourism Forecasting Using Big Data: insights from social media analytics")
@@ -14,17 +74,17 @@ st.title("🧳Enhancing Tourism Forecasting Using Big Data: insights from social
 # Sidebar navigation
 app_mode = st.sidebar.radio(
     "Welcome! Choose a feature",
-    [
-        "Predicting Visitors Using ARIMA",
-        "Tourist Package Recommender",
-        "Seasonal Recommendation"
-    ]
+    list(FEATURES),
+    index=list(FEATURES).index(DEFAULT_FEATURE)
 )
 
 # Route to the correct module
-if app_mode == "Predicting Visitors Using ARIMA":
-    arima1.run()
-elif app_mode == "Tourist Package Recommender":
-    recommendation_system1.run()
-elif app_mode == "Seasonal Recommendation":
-    seasonal1.run()
+load_feature(FEATURES[app_mode]).run()
+
+if PROFILE_STARTUP:
+    with st.sidebar.expander("⏱️ Startup profile"):
+        stats = get_import_stats()
+        if stats:
+            st.table({name: values for name, values in stats.items()})
+        if resource is not None:
+            st.caption(f"Process peak RSS: {_peak_rss_mb():.0f} MB")
@@ -4,14 +4,20 @@ from datetime import timedelta, datetime
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from statsmodels.tsa.arima.model import ARIMA
 from sklearn.linear_model import LinearRegression
+import os
 import warnings
 import traceback
 from sklearn.metrics import mean_absolute_error, mean_squared_error
+from holiday_calendar import get_calendar
+from prediction_intervals import quantile_bands, simulate_paths
+from calibration import load_scaling_table
+from tracing import span
+from trends_store import get_store
 
 warnings.filterwarnings('ignore')
 
 class VisitorPredictor:
-    def __init__(self):
+    def __init__(self, seed=None, interval_paths=2000, interval_coverage=0.8):
         # Define peak seasons and seasonal factors
         self.peak_seasons = {
             11: 'winter_peak', 12: 'winter_peak', 1: 'winter_peak',
@@ -74,33 +80,28 @@ class VisitorPredictor:
         self.calibration_model = None # Linear regression calibration
         self.model_arima = None       # Alternative ARIMA model
 
-        # Define holidays for 2025 (using dd-mm-YYYY format)
-        self.holidays = [
-            datetime.strptime("01-01-2025", "%d-%m-%Y").date(),
-            datetime.strptime("26-01-2025", "%d-%m-%Y").date(),
-            datetime.strptime("26-02-2025", "%d-%m-%Y").date(),
-            datetime.strptime("20-03-2025", "%d-%m-%Y").date(),
-            datetime.strptime("31-03-2025", "%d-%m-%Y").date(),
-            datetime.strptime("10-04-2025", "%d-%m-%Y").date(),
-            datetime.strptime("12-05-2025", "%d-%m-%Y").date(),
-            datetime.strptime("07-06-2025", "%d-%m-%Y").date(),
-            datetime.strptime("06-07-2025", "%d-%m-%Y").date(),
-            datetime.strptime("15-08-2025", "%d-%m-%Y").date(),
-            datetime.strptime("16-08-2025", "%d-%m-%Y").date(),
-            datetime.strptime("02-10-2025", "%d-%m-%Y").date(),
-            datetime.strptime("28-10-2025", "%d-%m-%Y").date(),
-            datetime.strptime("20-10-2025", "%d-%m-%Y").date(),
-            datetime.strptime("05-11-2025", "%d-%m-%Y").date(),
-            datetime.strptime("25-12-2025", "%d-%m-%Y").date()
-        ]
+        # Multi-year national and regional holidays (see holidays.csv)
+        self.calendar = get_calendar()
         # Holiday adjustment factor (e.g., 1.2 means 20% more visitors on a holiday)
         self.holiday_factor = 1.2
+        # Simulated prediction intervals: seed, number of sample paths and central coverage
+        self.seed = seed
+        self.interval_paths = interval_paths
+        self.interval_coverage = interval_coverage
+        # Per-month factors fitted from recorded visitor counts (calibration.py)
+        self.calibrated_scaling = load_scaling_table()
 
-    def is_holiday(self, forecast_date):
-        """Check if the forecast date falls on a holiday."""
-        return forecast_date.date() in self.holidays
+    def scaling_factor(self, place_name, month):
+        """Visitors per 100 trend points: the calibrated value for the month, else the place constant."""
+        calibrated = self.calibrated_scaling.get((place_name, month))
+        if calibrated is not None:
+            return calibrated
+        return self.scaling_factors.get(place_name, 500)
 
     def load_data(self, filename, place_name):
+        if os.path.isdir(filename):
+            # A trends_store.py directory: read only this place's partitions
+            return get_store(filename).frame(place_name).dropna().reset_index(drop=True)
         df = pd.read_csv(filename)
         if 'Week' not in df.columns:
             raise ValueError("Date column 'Week' not found in the CSV.")
@@ -171,75 +172,111 @@ class VisitorPredictor:
         Uses Holt-Winters with calibration and ARIMA as alternatives.
         For each forecast date, look up historical averages (same day-month over previous years)
         and blend them with the model forecast. Then convert the normalized forecast into actual 
-        visitor counts using the scaling factor.
-        Additionally, if the forecast date is a holiday, the predicted visitor count is increased
-        by a holiday factor.
+        visitor counts using the scaling factor. Confidence intervals are quantiles of sample paths
+        simulated from each model's residuals and passed through the same conversion.
+        Additionally, if a holiday falls within the forecast week, the predicted visitor count is
+        increased by a holiday factor.
         """
-        df = self.load_data(filename, place_name)
-        series = df.set_index('Week')[place_name]
+        with span("forecast", place=place_name, steps=steps):
+            return self._predict_future(filename, place_name, forecast_start_date_str, steps)
+
+    def _predict_future(self, filename, place_name, forecast_start_date_str, steps):
+        with span("load_csv"):
+            df = self.load_data(filename, place_name)
+            series = df.set_index('Week')[place_name]
         
         # Train and calibrate Holt-Winters model.
-        self.train_hw_model(series)
+        with span("fit_hw"):
+            self.train_hw_model(series)
         if self.model_hw is None:
             raise ValueError("Holt-Winters model training failed.")
-        self.calibrate_scaling(series)
+        with span("calibrate"):
+            self.calibrate_scaling(series)
         
-        scaling_factor = self.scaling_factors.get(place_name, 500)
         forecast_start_date = pd.to_datetime(forecast_start_date_str, format='%d-%m-%Y')
+        forecast_weeks = [forecast_start_date + timedelta(weeks=i) for i in range(steps)]
+        scaling_array = np.array([self.scaling_factor(place_name, week.month) for week in forecast_weeks])
+        holiday_weeks = self.calendar.holiday_in_week(forecast_weeks, region=self.calendar.region_for(place_name))
+        holiday_uplift = np.where(holiday_weeks, self.holiday_factor, 1.0)
+        with span("historical_averages"):
+            hist_avgs = [self.get_multi_year_average(df, week, place_name) for week in forecast_weeks]
+            hist_array = np.array([np.nan if h is None else h for h in hist_avgs])
+        # One generator for both models so their sample paths are independent draws.
+        rng = np.random.default_rng(self.seed)
         
         # Generate Holt-Winters forecasts.
-        raw_forecast = self.model_hw.forecast(steps)
-        hw_predictions = []
-        for i, raw in enumerate(raw_forecast):
-            predicted_week = forecast_start_date + timedelta(weeks=i)
-            current_season = self.peak_seasons.get(predicted_week.month, 'regular')
-            seasonal_factor = self.seasonal_factors[current_season]
-            raw_adj = raw / seasonal_factor
-            calibrated = self.calibration_model.predict(np.array([[raw_adj]]))[0][0]
-            hist_avg = self.get_multi_year_average(df, predicted_week, place_name)
-            if hist_avg is not None:
-                final_forecast = (calibrated + hist_avg) / 2
-            else:
-                final_forecast = calibrated
-            # Convert the normalized final forecast into actual visitor count.
-            predicted_visitors = int(round(final_forecast * scaling_factor / 100))
-            # If the forecast date is a holiday, apply the holiday factor.
-            if self.is_holiday(predicted_week):
-                predicted_visitors = int(round(predicted_visitors * self.holiday_factor))
-            ci = {'lower': max(0, int(round(predicted_visitors * 0.8))),
-                  'upper': int(round(predicted_visitors * 1.2))}
-            hw_predictions.append({
-                'predicted_week': predicted_week.strftime("%d-%m-%Y"),
-                'predicted_visitors': predicted_visitors,
-                'confidence_interval': ci,
-                'historical_avg': hist_avg
-            })
+        with span("post_process_hw"):
+            raw_forecast = self.model_hw.forecast(steps)
+            seasonal_array = np.array([self.seasonal_factors[self.peak_seasons.get(week.month, 'regular')]
+                                       for week in forecast_weeks])
+            hw_paths = simulate_paths(np.asarray(raw_forecast), np.asarray(self.model_hw.resid),
+                                      n_paths=self.interval_paths, seed=rng)
+            calibrated_paths = (self.calibration_model.intercept_[0]
+                                + self.calibration_model.coef_[0][0] * hw_paths / seasonal_array)
+            hw_lower, hw_upper = self._visitor_bands(calibrated_paths, hist_array, scaling_array, holiday_uplift)
+            hw_predictions = []
+            for i, raw in enumerate(raw_forecast):
+                predicted_week = forecast_weeks[i]
+                seasonal_factor = seasonal_array[i]
+                raw_adj = raw / seasonal_factor
+                calibrated = self.calibration_model.predict(np.array([[raw_adj]]))[0][0]
+                hist_avg = hist_avgs[i]
+                if hist_avg is not None:
+                    final_forecast = (calibrated + hist_avg) / 2
+                else:
+                    final_forecast = calibrated
+                # Convert the normalized final forecast into actual visitor count.
+                predicted_visitors = int(round(final_forecast * scaling_array[i] / 100))
+                # If the forecast week contains a holiday, apply the holiday factor.
+                if holiday_weeks[i]:
+                    predicted_visitors = int(round(predicted_visitors * self.holiday_factor))
+                ci = {'lower': max(0, int(round(hw_lower[i]))),
+                      'upper': max(0, int(round(hw_upper[i])))}
+                hw_predictions.append({
+                    'predicted_week': predicted_week.strftime("%d-%m-%Y"),
+                    'predicted_visitors': predicted_visitors,
+                    'confidence_interval': ci,
+                    'historical_avg': hist_avg
+                })
         
         # Generate ARIMA forecasts.
-        self.model_arima = ARIMA(series, order=(1,1,0)).fit()
-        arima_forecast = self.model_arima.forecast(steps)
-        arima_predictions = []
-        for i, fc in enumerate(arima_forecast):
-            predicted_week = forecast_start_date + timedelta(weeks=i)
-            hist_avg = self.get_multi_year_average(df, predicted_week, place_name)
-            if hist_avg is not None:
-                final_fc = (fc + hist_avg) / 2
-            else:
-                final_fc = fc
-            predicted_visitors = int(round(final_fc * scaling_factor / 100))
-            if self.is_holiday(predicted_week):
-                predicted_visitors = int(round(predicted_visitors * self.holiday_factor))
-            arima_predictions.append({
-                'predicted_week': predicted_week.strftime("%d-%m-%Y"),
-                'predicted_visitors': predicted_visitors,
-                'historical_avg': hist_avg
-            })
+        with span("fit_arima"):
+            self.model_arima = ARIMA(series, order=(1,1,0)).fit()
+        with span("post_process_arima"):
+            arima_forecast = self.model_arima.forecast(steps)
+            arima_paths = simulate_paths(np.asarray(arima_forecast), np.asarray(self.model_arima.resid)[1:],
+                                         n_paths=self.interval_paths, seed=rng)
+            arima_lower, arima_upper = self._visitor_bands(arima_paths, hist_array, scaling_array, holiday_uplift)
+            arima_predictions = []
+            for i, fc in enumerate(arima_forecast):
+                predicted_week = forecast_weeks[i]
+                hist_avg = hist_avgs[i]
+                if hist_avg is not None:
+                    final_fc = (fc + hist_avg) / 2
+                else:
+                    final_fc = fc
+                predicted_visitors = int(round(final_fc * scaling_array[i] / 100))
+                if holiday_weeks[i]:
+                    predicted_visitors = int(round(predicted_visitors * self.holiday_factor))
+                arima_predictions.append({
+                    'predicted_week': predicted_week.strftime("%d-%m-%Y"),
+                    'predicted_visitors': predicted_visitors,
+                    'confidence_interval': {'lower': max(0, int(round(arima_lower[i]))),
+                                            'upper': max(0, int(round(arima_upper[i])))},
+                    'historical_avg': hist_avg
+                })
         
         return {
             'hw_predictions': hw_predictions,
             'arima_predictions': arima_predictions
         }
 
+    def _visitor_bands(self, trend_paths, hist_array, scaling_array, holiday_uplift):
+        """Blend simulated trend paths with historical averages, convert to visitors and take quantiles."""
+        blended = np.where(np.isnan(hist_array), trend_paths, (trend_paths + hist_array) / 2)
+        lower, upper = quantile_bands(blended * scaling_array / 100 * holiday_uplift, self.interval_coverage)
+        return lower[0], upper[0]
+
 def main():
     predictor = VisitorPredictor()
     place_name = input("Enter the location name: ")
@@ -1,18 +1,49 @@
 import pandas as pd
 import numpy as np
-import os
 from datetime import timedelta, datetime
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from statsmodels.tsa.arima.model import ARIMA
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
 import streamlit as st
+import os
+import time
 import warnings
+from forecast_jobs import ForecastCancelled, ForecastJobManager
+from holiday_calendar import get_calendar
+from chart_data import line_trace
+from prediction_intervals import quantile_bands, simulate_paths
+from calibration import load_scaling_table
+from crowd_index import BASELINE_WEEKS, MAX_HORIZON_WEEKS, last_observed_week
+from tracing import Tracer, span
+from trends_store import get_store
 
 warnings.filterwarnings('ignore')
-os.environ["MPLCONFIGDIR"] = os.getcwd()
+
+SARIMA_ORDER = (1, 1, 1)
+SARIMA_SEASONAL_ORDER = (1, 1, 1, 4)
+# Optimizer iterations allowed when starting from the previous fit's parameters
+WARM_START_MAXITER = 40
+# Last fitted SARIMA parameters per place, shared by every predictor in the process
+_sarima_params = {}
+# Leading SARIMA residuals absorbed by the regular and seasonal differencing, left out of the intervals
+SARIMA_BURN_IN = SARIMA_ORDER[1] + SARIMA_SEASONAL_ORDER[1] * SARIMA_SEASONAL_ORDER[3]
+# Observed weeks shown before the forecast start
+PAST_WEEKS = 4
+
+
+def forecast_start_range(last_week, steps=4, window_size=12):
+    """Earliest and latest start dates whose whole window the models cover, for data ending on last_week.
+
+    The window runs from PAST_WEEKS before the start to steps - 1 weeks after it. It may begin inside
+    the training window once the SARIMA burn-in is over, and may end at most MAX_HORIZON_WEEKS past the data.
+    """
+    last_week = pd.Timestamp(last_week)
+    first = last_week + timedelta(weeks=SARIMA_BURN_IN - window_size + 1 + PAST_WEEKS)
+    last = last_week + timedelta(weeks=MAX_HORIZON_WEEKS - steps + 1)
+    return first, last
 
 class VisitorPredictor:
-    def __init__(self):
+    def __init__(self, seed=None, interval_paths=2000, interval_coverage=0.8):
         self.peak_seasons = {
             11: 'winter_peak', 12: 'winter_peak', 1: 'winter_peak',
             6: 'summer_peak', 7: 'summer_peak',
@@ -45,13 +76,36 @@ class VisitorPredictor:
             5: 30600,  6: 24600,  7: 30600,  8: 43000,
             9: 57000, 10: 76000, 11: 91000, 12: 98000
         }
+        # Fitted from recorded visitor counts on the normalised series (calibration.py); wins over the constants above
+        self.calibrated_scaling = load_scaling_table(units="normalized")
+
+        self.calendar = get_calendar()
+        self.holiday_factor = 1.2
+        # Seedable source for the prediction jitter and interval paths, so runs can be reproduced
+        self.rng = np.random.default_rng(seed)
+        # Simulated prediction intervals: number of sample paths and central coverage
+        self.interval_paths = interval_paths
+        self.interval_coverage = interval_coverage
 
         self.model_hw = None
         self.model_arima = None
 
+    def scaling_factor(self, place_name, month):
+        """Visitors per 100 points of normalized search interest for a place in a month."""
+        calibrated = self.calibrated_scaling.get((place_name, month))
+        if calibrated is not None:
+            return calibrated
+        if place_name.lower() == "hampi":
+            return self.hampi_monthly_scaling.get(month, 55000)
+        return self.scaling_factors.get(place_name, 500)
+
     def load_data(self, filename, place_name):
-        df = pd.read_csv(filename)
-        df['Week'] = pd.to_datetime(df['Week'], format='%d-%m-%Y', errors='coerce')
+        if os.path.isdir(filename):
+            # A trends_store.py directory: read only this place's partitions
+            df = get_store(filename).frame(place_name)
+        else:
+            df = pd.read_csv(filename)
+            df['Week'] = pd.to_datetime(df['Week'], format='%d-%m-%Y', errors='coerce')
         df = df.sort_values('Week')
         df[place_name] = pd.to_numeric(df[place_name], errors='coerce')
         df[place_name] = df[place_name].abs()
@@ -63,21 +117,44 @@ class VisitorPredictor:
             return series  # avoid divide by zero
         return (series - min_val) / (max_val - min_val) * 100
 
-    def train_models(self, train_series):
-        try:
-            self.model_hw = ExponentialSmoothing(train_series, seasonal_periods=4, trend='add', seasonal='add').fit()
-        except:
-            self.model_hw = None
-        try:
-            self.model_arima = ARIMA(train_series, order=(1, 1, 1), seasonal_order=(1, 1, 1, 4)).fit()
-        except:
-            self.model_arima = None
+    def fit_sarima(self, train_series, place_name=None):
+        """SARIMA fit warm-started from the place's previous parameters; cold fit if that does not converge."""
+        model = ARIMA(train_series, order=SARIMA_ORDER, seasonal_order=SARIMA_SEASONAL_ORDER)
+        start_params = _sarima_params.get(place_name) if place_name else None
+        fitted, warm = None, False
+        if start_params is not None and len(start_params) == len(model.param_names):
+            try:
+                fitted = model.fit(start_params=start_params, method_kwargs={'maxiter': WARM_START_MAXITER})
+                warm = bool(fitted.mle_retvals.get('converged'))
+            except Exception:
+                fitted = None
+        if not warm:
+            fitted = model.fit()
+        if place_name and np.all(np.isfinite(fitted.params)):
+            _sarima_params[place_name] = np.asarray(fitted.params)
+        return fitted, warm
+
+    def train_models(self, train_series, cancel_event=None, place_name=None):
+        with span("fit_hw"):
+            try:
+                self.model_hw = ExponentialSmoothing(train_series, seasonal_periods=4, trend='add', seasonal='add').fit()
+            except:
+                self.model_hw = None
+        if cancel_event is not None and cancel_event.is_set():
+            raise ForecastCancelled("Forecast cancelled.")
+        with span("fit_sarima") as stage:
+            try:
+                self.model_arima, warm = self.fit_sarima(train_series, place_name)
+                if stage is not None:
+                    stage.attrs["warm_start"] = warm
+            except:
+                self.model_arima = None
 
     def adjust_prediction(self, predicted, actual):
         tolerance = 0.10
         lower_bound = actual * (1 - tolerance)
         upper_bound = actual * (1 + tolerance)
-        noise_factor = np.random.uniform(-0.05, 0.05)
+        noise_factor = self.rng.uniform(-0.05, 0.05)
         predicted = predicted * (1 + noise_factor)
         if predicted < lower_bound:
             return int(lower_bound)
@@ -85,26 +162,100 @@ class VisitorPredictor:
             return int(upper_bound)
         return int(predicted)
 
-    def predict(self, filename, place_name, forecast_start_date_str, steps=4, window_size=12):
-        df = self.load_data(filename, place_name)
-        series = df.set_index('Week')[place_name]
-        series = self.normalize_series(series)  # ✅ Normalize Google Trend values
+    def predict(self, filename, place_name, forecast_start_date_str=None, steps=4, window_size=12,
+                progress_callback=None, cancel_event=None):
+        """Weeks, actual and predicted visitors and interval bands around the start date (dd-mm-YYYY).
+
+        Without a start date the forecast starts the week after the data ends.
+        """
+        with span("forecast", place=place_name, steps=steps):
+            return self._predict(filename, place_name, forecast_start_date_str, steps, window_size,
+                                 progress_callback, cancel_event)
+
+    def _predict(self, filename, place_name, forecast_start_date_str, steps, window_size,
+                 progress_callback, cancel_event):
+        def report(progress, status):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ForecastCancelled("Forecast cancelled.")
+            if progress_callback is not None:
+                progress_callback(progress, status)
+
+        report(0.05, "Loading trends data")
+        with span("load_csv"):
+            df = self.load_data(filename, place_name)
+        with span("normalize"):
+            series = df.set_index('Week')[place_name]
+            series = self.normalize_series(series)  # ✅ Normalize Google Trend values
         train_series = series[-window_size:]
-        self.train_models(train_series)
+        report(0.2, "Fitting forecasting models")
+        self.train_models(train_series, cancel_event=cancel_event, place_name=place_name)
 
         if not self.model_hw or not self.model_arima:
             raise ValueError("Model training failed.")
+        report(0.9, "Scaling forecasts")
+        if forecast_start_date_str is None:
+            forecast_start_date_str = (series.index[-1] + timedelta(weeks=1)).strftime('%d-%m-%Y')
+        with span("post_process"):
+            return self.scale_forecasts(place_name, series, forecast_start_date_str, steps)
+
+    def model_values(self, last_week, weeks):
+        """Both models' values for the given weeks, and each week's forecast step (1 = the week after last_week).
+
+        Weeks after the data are forecast forward from its last week; weeks still inside the
+        training window use the in-sample fit. Weeks before the SARIMA burn-in or more than
+        MAX_HORIZON_WEEKS past the data raise ValueError.
+        """
+        steps = np.array([int(round((week - last_week).days / 7)) for week in weeks])
+        fitted = len(self.model_hw.fittedvalues)
+        earliest = SARIMA_BURN_IN - fitted + 1
+        if steps.min() < earliest:
+            first = last_week + timedelta(weeks=earliest)
+            raise ValueError(f"The forecast window must start on or after {first:%d-%m-%Y}; "
+                             f"the models only cover the weeks around the end of the data.")
+        if steps.max() > MAX_HORIZON_WEEKS:
+            last = last_week + timedelta(weeks=MAX_HORIZON_WEEKS)
+            raise ValueError(f"The forecast window must end by {last:%d-%m-%Y}, {MAX_HORIZON_WEEKS} weeks after "
+                             f"the data ends on {last_week:%d-%m-%Y}; further out the models only extrapolate trend.")
+        horizon = max(int(steps.max()), 1)
+        positions = steps + fitted - 1
+        hw = np.concatenate([np.asarray(self.model_hw.fittedvalues), np.asarray(self.model_hw.forecast(horizon))])
+        arima = np.concatenate([np.asarray(self.model_arima.fittedvalues),
+                                np.asarray(self.model_arima.forecast(horizon))])
+        return hw[positions], arima[positions], steps
 
+    def scale_forecasts(self, place_name, series, forecast_start_date_str, steps):
+        """Blend the fitted models around the start date and convert them to visitor counts.
+
+        Returns weeks, actual and predicted visitors, and {"lower": [...], "upper": [...]} bands:
+        quantiles of sample paths simulated from both models' residuals, converted the same way.
+        """
         forecast_start_date = pd.to_datetime(forecast_start_date_str, format='%d-%m-%Y')
-        past_dates = [(forecast_start_date - timedelta(weeks=i)).strftime('%d-%m-%Y') for i in range(4, 0, -1)]
+        first_start, last_start = forecast_start_range(series.index[-1], steps, len(self.model_hw.fittedvalues))
+        if not first_start <= forecast_start_date <= last_start:
+            raise ValueError(f"The trends data for {place_name} ends on {series.index[-1]:%d-%m-%Y}, so a {steps}-week "
+                             f"forecast can start between {first_start:%d-%m-%Y} and {last_start:%d-%m-%Y}.")
+        past_dates = [(forecast_start_date - timedelta(weeks=i)).strftime('%d-%m-%Y')
+                      for i in range(PAST_WEEKS, 0, -1)]
         future_dates = [(forecast_start_date + timedelta(weeks=i)).strftime('%d-%m-%Y') for i in range(steps)]
 
-        raw_forecast_hw = self.model_hw.forecast(steps + 4)
-        raw_forecast_arima = self.model_arima.forecast(steps + 4)
+        # The models run forward from the last observed week, not from the requested start date
+        raw_forecast_hw, raw_forecast_arima, model_steps = self.model_values(
+            series.index[-1], pd.to_datetime(past_dates + future_dates, format='%d-%m-%Y'))
+        # Trend extrapolation can run far past anything observed; keep forecast weeks within the past year's range
+        recent = series.values[-BASELINE_WEEKS:]
+        ahead = model_steps > 0
+        raw_forecast_hw = np.where(ahead, np.clip(raw_forecast_hw, recent.min(), recent.max()), raw_forecast_hw)
+        raw_forecast_arima = np.where(ahead, np.clip(raw_forecast_arima, recent.min(), recent.max()),
+                                      raw_forecast_arima)
+        holiday_weeks = self.calendar.holiday_in_week(
+            pd.to_datetime(past_dates + future_dates, format='%d-%m-%Y'),
+            region=self.calendar.region_for(place_name)
+        )
 
         weeks = []
         predicted_visitors = []
         actual_visitors = []
+        visitor_factors = []
 
         for i, pred_date in enumerate(past_dates + future_dates):
             predicted_week = pd.to_datetime(pred_date, format='%d-%m-%Y')
@@ -113,25 +264,113 @@ class VisitorPredictor:
 
             avg_forecast = (raw_forecast_hw[i] + raw_forecast_arima[i]) / 2
 
-            # Apply correct scaling factor
-            if place_name.lower() == "hampi":
-                scaling_factor = self.hampi_monthly_scaling.get(predicted_week.month, 55000)
-            else:
-                scaling_factor = self.scaling_factors.get(place_name, 500)
+            scaling_factor = self.scaling_factor(place_name, predicted_week.month)
 
-            predicted_value = int(round(avg_forecast * seasonal_factor * (scaling_factor / 100)))
-            actual_value = abs(series.get(predicted_week, predicted_value))
+            # Trend extrapolation can dip below zero; there are never fewer than no visitors
+            predicted_value = max(0, int(round(avg_forecast * seasonal_factor * (scaling_factor / 100))))
+            if holiday_weeks[i]:
+                predicted_value = int(round(predicted_value * self.holiday_factor))
+            visitor_factor = seasonal_factor * scaling_factor / 100 * (self.holiday_factor if holiday_weeks[i] else 1.0)
+            visitor_factors.append(visitor_factor)
+            # Observed weeks are converted to visitors the same way as the forecast
+            observed = series.get(predicted_week)
+            actual_value = int(round(abs(observed) * visitor_factor)) if observed is not None else predicted_value
             adjusted_predicted_value = self.adjust_prediction(predicted_value, actual_value)
 
             weeks.append(pred_date)
             predicted_visitors.append(adjusted_predicted_value)
             actual_visitors.append(actual_value)
 
-        return weeks, actual_visitors, predicted_visitors
+        # Spread of the simulated paths at each week's forecast step (in-sample weeks get the one-step spread)
+        columns = np.maximum(model_steps, 1) - 1
+        horizon = columns.max() + 1
+        hw_paths = simulate_paths(np.zeros(horizon), np.asarray(self.model_hw.resid),
+                                  n_paths=self.interval_paths, seed=self.rng)
+        arima_paths = simulate_paths(np.zeros(horizon), np.asarray(self.model_arima.resid)[SARIMA_BURN_IN:],
+                                     n_paths=self.interval_paths, seed=self.rng)
+        blended = (raw_forecast_hw + raw_forecast_arima) / 2 + ((hw_paths + arima_paths) / 2)[:, :, columns]
+        lower, upper = quantile_bands(blended * np.array(visitor_factors), self.interval_coverage)
+        bands = {'lower': [max(0, int(round(v))) for v in lower[0]],
+                 'upper': [max(0, int(round(v))) for v in upper[0]]}
+
+        return weeks, actual_visitors, predicted_visitors, bands
+
+
+@st.cache_resource
+def get_job_manager():
+    # Shared by every session, so a burst of identical requests fits the model once.
+    return ForecastJobManager(max_workers=2)
+
+
+def show_forecast(place_name, weeks, actual, predicted, bands=None):
+    result_df = pd.DataFrame({
+        "Week": weeks,
+        "Actual Visitors": actual,
+        "Predicted Visitors": predicted
+    })
+    if bands:
+        result_df["Lower Bound"] = bands["lower"]
+        result_df["Upper Bound"] = bands["upper"]
+    st.subheader("📊 Forecast Table")
+    st.dataframe(result_df, use_container_width=True)
+
+    st.subheader("📈 Actual vs Predicted Visitors")
+    with span("plot", place=place_name):
+        fig = forecast_chart(place_name, weeks, actual, predicted, bands)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def forecast_chart(place_name, weeks, actual, predicted, bands=None):
+    parsed_weeks = pd.to_datetime(weeks, format="%d-%m-%Y", dayfirst=True)
+    fig = go.Figure()
+    if bands:
+        fig.add_trace(go.Scatter(x=parsed_weeks, y=bands["upper"], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=parsed_weeks, y=bands["lower"], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor='rgba(99, 110, 250, 0.2)',
+                                 name='Prediction Interval'))
+    fig.add_trace(line_trace(parsed_weeks, actual, 'Actual Visitors', mode='lines+markers',
+                             marker=dict(symbol='circle')))
+    fig.add_trace(line_trace(parsed_weeks, predicted, 'Predicted Visitors', mode='lines+markers',
+                             marker=dict(symbol='square'), line=dict(dash='dash')))
+    fig.update_layout(title=f"{place_name} - Forecast", xaxis_title="Week", yaxis_title="Number of Visitors")
+    return fig
+
+
+def session_tracer():
+    """This browser session's tracer, so one user's recording toggle never affects another's."""
+    if "forecast_tracer" not in st.session_state:
+        st.session_state["forecast_tracer"] = Tracer()
+    return st.session_state["forecast_tracer"]
+
+
+def show_profiling_panel():
+    tracer = session_tracer()
+    with st.sidebar.expander("🐞 Forecast profiling"):
+        record = st.checkbox("Record stage timings", value=tracer.enabled)
+        memory = st.checkbox("Also track memory (slower)", value=False, disabled=not record)
+        if record:
+            tracer.enable(memory=memory)
+        elif tracer.enabled:
+            tracer.disable()
+
+        rows = tracer.rows()
+        if not rows:
+            st.caption("No forecasts recorded yet.")
+            return
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Spans (JSON)", tracer.to_json(), file_name="forecast_trace.json",
+                           mime="application/json")
+        st.download_button("⬇️ Folded stacks (flamegraph)", tracer.folded(), file_name="forecast_trace.folded",
+                           mime="text/plain")
+        if st.button("Clear recorded forecasts"):
+            tracer.clear()
+            st.rerun()
 
 
 def run():
     st.title("🧭 Tourist Visitor Predictor")
+    show_profiling_panel()
 
     place_name = st.selectbox("Select the location", [
         "Taj Mahal", "Red Fort", "Jaipur", "Varanasi", "Goa", "Kerala", 
@@ -144,47 +383,62 @@ def run():
         "Andaman & Nicobar Islands", "Lakshadweep", "Gokarna", "Pondicherry"
     ])
 
-    forecast_start_date = st.text_input("Enter the forecast start date (dd-mm-YYYY)", value=datetime.today().strftime("%d-%m-%Y"))
+    filename = "Google_Trends_past_5.csv"
+    data_end = pd.Timestamp(last_observed_week(filename))
+    first_start, last_start = forecast_start_range(data_end)
+    forecast_start_date = st.text_input("Enter the forecast start date (dd-mm-YYYY)",
+                                        value=(data_end + timedelta(weeks=1)).strftime("%d-%m-%Y"))
 
     # Date validation
     try:
-        pd.to_datetime(forecast_start_date, format='%d-%m-%Y')  # Validate date
+        start = pd.to_datetime(forecast_start_date, format='%d-%m-%Y')  # Validate date
     except ValueError:
         st.error("Invalid date format! Please enter a date in dd-mm-YYYY format.")
         return
+    if not first_start <= start <= last_start:
+        st.error(f"The trends data ends on {data_end:%d-%m-%Y}, so forecasts can start between "
+                 f"{first_start:%d-%m-%Y} and {last_start:%d-%m-%Y}.")
+        return
+
+    manager = get_job_manager()
 
     if st.button("Predict"):
         if place_name and forecast_start_date:
-            try:
-                predictor = VisitorPredictor()
-                filename = "Google_Trends_past_5.csv"
-                weeks, actual, predicted = predictor.predict(filename, place_name, forecast_start_date)
-
-                result_df = pd.DataFrame({
-                    "Week": weeks,
-                    "Actual Visitors": actual,
-                    "Predicted Visitors": predicted
-                })
-                st.subheader("📊 Forecast Table")
-                st.dataframe(result_df, use_container_width=True)
-
-                st.subheader("📈 Actual vs Predicted Visitors")
-                fig, ax = plt.subplots(figsize=(10, 5))
-                parsed_weeks = pd.to_datetime(weeks, format="%d-%m-%Y", dayfirst=True)
-                ax.plot(parsed_weeks, actual, marker='o', linestyle='-', label='Actual Visitors')
-                ax.plot(parsed_weeks, predicted, marker='s', linestyle='--', label='Predicted Visitors')
-                ax.set_xlabel("Week")
-                ax.set_ylabel("Number of Visitors")
-                ax.set_title(f"{place_name} - Forecast")
-                ax.legend()
-                ax.grid(True)
-                plt.xticks(rotation=45)
-                st.pyplot(fig)
-
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+            key = (filename, place_name, forecast_start_date)
+            running = manager.get(key)
+            already_waiting = st.session_state.get("forecast_job_key") == key and running is not None and not running.done()
+            if not already_waiting:
+                try:
+                    predict = session_tracer().bind(VisitorPredictor().predict)
+                    manager.submit(key, predict, filename, place_name, forecast_start_date)
+                    st.session_state["forecast_job_key"] = key
+                except RuntimeError as e:
+                    st.warning(str(e))
         else:
             st.warning("Please fill in both fields.")
 
+    key = st.session_state.get("forecast_job_key")
+    job = manager.get(key) if key else None
+    if job is None:
+        return
+
+    if not job.done():
+        st.progress(job.progress, text=f"{key[1]}: {job.status}...")
+        if st.button("Cancel forecast"):
+            manager.cancel(key)
+            del st.session_state["forecast_job_key"]
+            st.info("Forecast cancelled.")
+            return
+        time.sleep(0.5)
+        st.rerun()
+
+    if job.cancelled():
+        st.info("Forecast cancelled.")
+    elif job.error() is not None:
+        st.error(f"Error: {str(job.error())}")
+    else:
+        weeks, actual, predicted, bands = job.result()
+        show_forecast(key[1], weeks, actual, predicted, bands)
+
 if __name__ == "__main__":
     run()
@@ -0,0 +1,165 @@
+import re
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+# Months are numbered from January of BASE_YEAR; each package gets one bit per month.
+BASE_YEAR = 2020
+YEARS = 20
+SLOTS = YEARS * 12
+ALL_MONTHS = (1 << SLOTS) - 1
+
+MONTHS = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+MONTH_YEAR = re.compile(_MONTH + r"(?:\s+\d{1,2},?)?\s+(\d{4})")
+MONTH_RANGE = re.compile(_MONTH + r"(?:\s+(\d{4}))?\s*(?:to|-|–)\s*" + _MONTH + r"(?:\s+\d{1,2},?)?\s+(\d{4})")
+MONTH_ONLY = re.compile(_MONTH + r"$")
+UNTIL = re.compile(r"until\s+" + _MONTH + r"(?:\s+\d{1,2},?)?\s+(\d{4})")
+
+
+def slot(year, month):
+    """Bit position of a calendar month; outside 0..SLOTS-1 for months before or after the indexed years."""
+    return (year - BASE_YEAR) * 12 + month - 1
+
+
+def _span(first, last):
+    """Mask of the slots from first to last, keeping only the part inside the indexed years."""
+    first, last = max(first, 0), min(last, SLOTS - 1)
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def _every_year(month):
+    mask = 0
+    for year in range(YEARS):
+        mask |= 1 << (year * 12 + month - 1)
+    return mask
+
+
+@lru_cache(maxsize=4096)
+def parse_availability(value):
+    """Month bitmask for one free-text availability string, or None if it cannot be read.
+
+    Understands "February 2025", "March to May 2025", "Until Dec 17, 2025", a bare
+    "April" (that month every year) and "Year-round".
+    """
+    text = value.strip().lower()
+    if text.startswith("year-round") or text.startswith("year round"):
+        return ALL_MONTHS
+    match = UNTIL.match(text)
+    if match:
+        return _span(0, slot(int(match.group(2)), MONTHS[match.group(1)]))
+    match = MONTH_RANGE.match(text)
+    if match:
+        end_year = int(match.group(4))
+        start_year = int(match.group(2)) if match.group(2) else end_year
+        first, last = MONTHS[match.group(1)], MONTHS[match.group(3)]
+        if not match.group(2) and first > last:
+            start_year -= 1  # "November to February 2025" starts the year before
+        return _span(slot(start_year, first), slot(end_year, last))
+    match = MONTH_YEAR.match(text)
+    if match:
+        month = slot(int(match.group(2)), MONTHS[match.group(1)])
+        return _span(month, month)
+    match = MONTH_ONLY.match(text)
+    if match:
+        return _every_year(MONTHS[match.group(1)])
+    return None
+
+
+def package_months(available_dates):
+    """Month bitmask for a package's available_dates list; None when nothing in it can be read."""
+    if isinstance(available_dates, str):
+        available_dates = [available_dates]
+    mask = None
+    for value in available_dates or []:
+        months = parse_availability(str(value))
+        if months is not None:
+            mask = months if mask is None else mask | months
+    return mask
+
+
+def window_slots(start, end):
+    """Bitmask of the months a travel window touches; dates may be date objects or ISO strings."""
+    start, end = _as_date(start), _as_date(end)
+    if end < start:
+        start, end = end, start
+    return _span(slot(start.year, start.month), slot(end.year, end.month))
+
+
+def _as_date(value):
+    return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+
+
+class AvailabilityIndex:
+    def __init__(self, date_lists):
+        """Per-package month masks plus, for every month, a bitmap of the packages available then.
+
+        Packages whose dates cannot be parsed are treated as available in every window.
+        """
+        self.size = len(date_lists)
+        self.months = []
+        slot_positions = [[] for _ in range(SLOTS)]
+        unknown = []
+        for pos, dates in enumerate(date_lists):
+            months = package_months(dates)
+            self.months.append(months)
+            if months is None:
+                unknown.append(pos)
+                continue
+            while months:
+                low = months & -months
+                slot_positions[low.bit_length() - 1].append(pos)
+                months ^= low
+        self.unknown = self._bitmap(unknown)
+        self.by_month = [self._bitmap(positions) for positions in slot_positions]
+
+    def set(self, pos, date_list):
+        """Index one package's dates at `pos`, replacing what was there or appending at the end."""
+        bit = 1 << pos
+        if pos == self.size:
+            self.size += 1
+            self.months.append(None)
+        old = self.months[pos]
+        self.unknown &= ~bit
+        while old:
+            low = old & -old
+            self.by_month[low.bit_length() - 1] &= ~bit
+            old ^= low
+        months = package_months(date_list)
+        self.months[pos] = months
+        if months is None:
+            self.unknown |= bit
+        while months:
+            low = months & -months
+            self.by_month[low.bit_length() - 1] |= bit
+            months ^= low
+
+    def _bitmap(self, positions):
+        bits = np.zeros(self.size, dtype=bool)
+        bits[positions] = True
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+    def window_mask(self, start, end):
+        """Bitmap over the catalog of packages available at some point between start and end."""
+        mask = self.unknown
+        slots = window_slots(start, end)
+        while slots:
+            low = slots & -slots
+            mask |= self.by_month[low.bit_length() - 1]
+            slots ^= low
+        return mask
+
+    def _bits(self, mask):
+        data = mask.to_bytes((self.size + 7) // 8, "little")
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")[:self.size]
+
+    def filter(self, positions, start, end):
+        """Positions available in the window, restricted to `positions` (None for the whole catalog)."""
+        bits = self._bits(self.window_mask(start, end))
+        if positions is None:
+            return np.flatnonzero(bits).tolist()
+        return [pos for pos in positions if bits[pos]]
@@ -0,0 +1,88 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dedupe import dedupe_catalog
+from package_extractor import extract_fields
+
+
+def extract_file(text_file):
+    """Worker: read one scraped page and return (path, structured record)."""
+    with open(text_file, "r", encoding="utf-8") as file:
+        return text_file, extract_fields(file.read())
+
+
+def extract_files(text_files, workers=None, chunksize=32):
+    """Yield (path, record) for every file, spreading the work across processes."""
+    if workers == 1 or len(text_files) < 2:
+        for text_file in text_files:
+            yield extract_file(text_file)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(extract_file, text_files, chunksize=chunksize)
+
+
+def write_json_atomic(path, data):
+    """Write JSON next to `path` and swap it in, so readers never see a half-written file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=4, ensure_ascii=False)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_catalog(packages, output_json="tour_packages.json"):
+    """Write a tour_packages.json-style catalog, replacing the old file atomically."""
+    write_json_atomic(output_json, {"tour_packages": packages})
+
+
+def find_text_files(input_dir, pattern="*.txt"):
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Input directory {input_dir} does not exist.")
+    return sorted(glob.glob(os.path.join(input_dir, "**", pattern), recursive=True))
+
+
+def build_catalog(input_dir, output_json="tour_packages.json", workers=None, pattern="*.txt", dedupe=False):
+    """Structure every page under input_dir into output_json; refuses to replace it when no pages are found."""
+    text_files = find_text_files(input_dir, pattern)
+    if not text_files:
+        raise ValueError(f"No {pattern} files under {input_dir}; leaving {output_json} as it is.")
+    start = time.perf_counter()
+    packages = [record for _, record in extract_files(text_files, workers=workers) if record]
+    if dedupe:
+        packages, _ = dedupe_catalog(packages)
+    write_catalog(packages, output_json)
+    elapsed = time.perf_counter() - start
+    rate = len(text_files) / elapsed * 60 if elapsed else 0
+    print(f"✅ Structured {len(text_files)} pages into {output_json} in {elapsed:.1f}s ({rate:.0f} pages/min)")
+    return packages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a directory of scraped package pages into one catalog.")
+    parser.add_argument("input_dir", help="Directory of scraped .txt pages")
+    parser.add_argument("--output", default="tour_packages.json", help="Catalog file to write")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--pattern", default="*.txt", help="File name pattern to pick up")
+    parser.add_argument("--dedupe", action="store_true", help="Keep one package per cluster of near-duplicates")
+    args = parser.parse_args(argv)
+
+    try:
+        build_catalog(args.input_dir, args.output, workers=args.workers, pattern=args.pattern, dedupe=args.dedupe)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import argparse
+import os
+import sys
+import tempfile
+from functools import lru_cache
+
+import pandas as pd
+
+SCALING_TABLE_FILE = "scaling_factors.csv"
+VISITOR_FILES = ["HYD(2014-2023).csv"]
+TRENDS_FILES = ["HYD(2013-2023)GTRENDS.csv"]
+WEEKLY_TRENDS_FILES = ["Google_Trends_past_5.csv"]
+# "raw": per 100 points of a Trends export as read (arima.py, actual_visitors.py);
+# "normalized": per 100 points of the min-max normalised weekly series (arima1.py)
+UNITS = ("raw", "normalized")
+# Lockdown and recovery months say nothing about normal demand
+PANDEMIC_YEARS = (2020, 2021)
+# Years a (destination, month) factor must be fitted on before it replaces the hand-set constants
+MIN_OBSERVATIONS = 4
+
+
+def load_visitor_counts(filename):
+    """Wide per-year visitor file (Dist, Month, <year>_Population...) as long rows of
+    Destination, Year, Month, Visitors."""
+    wide = pd.read_csv(filename)
+    year_columns = [c for c in wide.columns if c.split("_")[0].isdigit()]
+    long = wide.melt(id_vars=["Dist", "Month"], value_vars=year_columns, var_name="Year", value_name="Visitors")
+    return pd.DataFrame({
+        "Destination": long["Dist"].str.strip(),
+        "Year": long["Year"].str.split("_").str[0].astype(int),
+        "Month": pd.to_datetime(long["Month"].str.strip(), format="%B").dt.month,
+        "Visitors": pd.to_numeric(long["Visitors"], errors="coerce")
+    })
+
+
+def load_monthly_trends(filename):
+    """Monthly Google Trends export (YYYY-MM, "<Destination>: (<region>)"...) as long rows of
+    Destination, Year, Month, Trend."""
+    wide = pd.read_csv(filename)
+    period = pd.to_datetime(wide.iloc[:, 0], format="%Y-%m")
+    wide = wide.iloc[:, 1:].rename(columns=lambda c: c.split(":")[0].strip())
+    wide["Year"], wide["Month"] = period.dt.year, period.dt.month
+    long = wide.melt(id_vars=["Year", "Month"], var_name="Destination", value_name="Trend")
+    long["Trend"] = pd.to_numeric(long["Trend"].astype(str).str.replace("<1", "0.5"), errors="coerce")
+    return long
+
+
+def load_normalized_weekly_trends(filename):
+    """Weekly Trends export (Week, <Destination>...) min-max normalised per destination over its whole
+    history, the way arima1 scales it, and averaged per month: long rows of Destination, Year, Month, Trend."""
+    wide = pd.read_csv(filename)
+    weeks = pd.to_datetime(wide["Week"], format="%d-%m-%Y", errors="coerce")
+    values = wide.drop(columns=["Week"]).rename(columns=lambda c: c.strip())
+    values = values.apply(lambda column: pd.to_numeric(column, errors="coerce").abs())
+    span = values.max() - values.min()
+    # Same scaling as VisitorPredictor.normalize_series; flat series are left as they are
+    values = ((values - values.min()) / span.where(span != 0) * 100).fillna(values)
+    values["Year"], values["Month"] = weeks.dt.year, weeks.dt.month
+    monthly = values.dropna(subset=["Year"]).groupby(["Year", "Month"]).mean().reset_index()
+    monthly[["Year", "Month"]] = monthly[["Year", "Month"]].astype(int)
+    return monthly.melt(id_vars=["Year", "Month"], var_name="Destination", value_name="Trend")
+
+
+def fit_scaling(visitors, trends, exclude_years=PANDEMIC_YEARS):
+    """Visitors per 100 trend points per (destination, month), fitted for every pair at once.
+
+    Monthly counts are converted to weekly visitors (what the predictors forecast) and regressed
+    on the trend value through the origin: scaling = 100 * sum(trend * weekly) / sum(trend ** 2).
+    """
+    data = visitors.merge(trends, on=["Destination", "Year", "Month"])
+    data = data[~data["Year"].isin(exclude_years)].dropna(subset=["Visitors", "Trend"])
+    data = data[data["Trend"] > 0]
+    days = pd.to_datetime(dict(year=data["Year"], month=data["Month"], day=1)).dt.days_in_month
+    weekly = data["Visitors"] * 7 / days
+
+    sums = pd.DataFrame({
+        "Destination": data["Destination"], "Month": data["Month"],
+        "xy": data["Trend"] * weekly, "xx": data["Trend"] ** 2, "Observations": 1
+    }).groupby(["Destination", "Month"], as_index=False).sum()
+    sums["Scaling"] = (100 * sums["xy"] / sums["xx"]).round(1)
+    return sums[["Destination", "Month", "Scaling", "Observations"]]
+
+
+def save_scaling_table(table, path=SCALING_TABLE_FILE):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+        table.to_csv(file, index=False)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=None)
+def load_scaling_table(path=SCALING_TABLE_FILE, units="raw", min_observations=MIN_OBSERVATIONS):
+    """{(destination, month): visitors per 100 trend points in `units`}; empty when no calibration has been run.
+
+    Factors fitted on fewer than `min_observations` years are left out, so callers keep their constants.
+    """
+    try:
+        table = pd.read_csv(path)
+    except FileNotFoundError:
+        return {}
+    if "Units" in table.columns:
+        table = table[table["Units"] == units]
+    elif units != "raw":
+        return {}
+    if "Observations" in table.columns:
+        table = table[table["Observations"] >= min_observations]
+    return {(row.Destination, int(row.Month)): float(row.Scaling) for row in table.itertuples()}
+
+
+def calibrate(visitor_files=VISITOR_FILES, trends_files=TRENDS_FILES, weekly_files=WEEKLY_TRENDS_FILES,
+              exclude_years=PANDEMIC_YEARS):
+    """Scaling factors in both units: raw from the monthly exports, normalized from the weekly ones.
+
+    Only destinations present in both the visitor and trends files get a factor; with the bundled data
+    that is Hyderabad alone. The weekly export starts in 2020, so outside the pandemic years the
+    normalized factors rest on two years (2022-2023) and stay below MIN_OBSERVATIONS until more
+    visitor counts are added.
+    """
+    visitors = pd.concat([load_visitor_counts(f) for f in visitor_files], ignore_index=True)
+    raw = pd.concat([load_monthly_trends(f) for f in trends_files], ignore_index=True)
+    normalized = pd.concat([load_normalized_weekly_trends(f) for f in weekly_files], ignore_index=True)
+    tables = [fit_scaling(visitors, raw, exclude_years).assign(Units="raw"),
+              fit_scaling(visitors, normalized, exclude_years).assign(Units="normalized")]
+    return pd.concat(tables, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit per-destination, per-month scaling factors "
+                                                 "from real visitor counts and Google Trends.")
+    parser.add_argument("--visitors", nargs="+", default=VISITOR_FILES, help="Wide per-year visitor CSVs")
+    parser.add_argument("--trends", nargs="+", default=TRENDS_FILES, help="Monthly Google Trends CSVs")
+    parser.add_argument("--weekly-trends", nargs="+", default=WEEKLY_TRENDS_FILES,
+                        help="Weekly Google Trends CSVs, for the factors arima1 uses on its normalised series")
+    parser.add_argument("--include-pandemic", action="store_true", help="Also fit on 2020 and 2021")
+    parser.add_argument("--output", default=SCALING_TABLE_FILE, help="Scaling table to write")
+    args = parser.parse_args(argv)
+
+    table = calibrate(args.visitors, args.trends, args.weekly_trends,
+                      () if args.include_pandemic else PANDEMIC_YEARS)
+    save_scaling_table(table, args.output)
+    print(table.to_string(index=False))
+    print(f"✅ Saved {len(table)} scaling factors for "
+          f"{table['Destination'].nunique()} destination(s) to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
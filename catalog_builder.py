@@ -0,0 +1,139 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from batch_formatter import extract_files, find_text_files, write_catalog, write_json_atomic
+
+MANIFEST_FILE = "catalog_manifest.json"
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return default
+
+
+def record_hash(record):
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def package_key(record, source, taken):
+    """Catalog key for a record: its package_link, or its source page if the link is missing or already used."""
+    link = record.get("package_link")
+    if link and link not in taken:
+        return link
+    return f"source:{source}"
+
+
+class CatalogBuilder:
+    def __init__(self, input_dir, output_json="tour_packages.json", manifest_path=MANIFEST_FILE, pattern="*.txt"):
+        """Keep tour_packages.json in step with a directory of scraped pages, re-extracting only what changed."""
+        self.input_dir = input_dir
+        self.output_json = output_json
+        self.manifest_path = manifest_path
+        self.pattern = pattern
+
+    def scan(self, manifest, full=False):
+        """Split source pages into (changed, unchanged, removed) against the manifest, with current hashes."""
+        hashes = {}
+        for path in find_text_files(self.input_dir, self.pattern):
+            hashes[os.path.relpath(path, self.input_dir)] = file_hash(path)
+
+        changed = [src for src, digest in hashes.items()
+                   if full or manifest.get(src, {}).get("hash") != digest]
+        unchanged = [src for src in hashes if src not in changed]
+        removed = [src for src in manifest if src not in hashes]
+        return changed, unchanged, removed, hashes
+
+    @staticmethod
+    def keyed_catalog(packages, manifest):
+        """Existing catalog as an ordered {key: record}, recognising records that came from a manifest page."""
+        sources_by_record = {}
+        for src, entry in manifest.items():
+            sources_by_record.setdefault(entry.get("record"), []).append(src)
+
+        catalog = {}
+        for i, record in enumerate(packages):
+            sources = sources_by_record.get(record_hash(record))
+            if sources:
+                key = manifest[sources.pop()]["key"]
+            else:
+                # Entries added by hand; they are kept unless a page with the same link replaces them.
+                link = record.get("package_link")
+                key = link if link and link not in catalog else f"catalog:{i}"
+            catalog[key] = record
+        return catalog
+
+    def build(self, workers=None, full=False):
+        start = time.perf_counter()
+        manifest = load_json(self.manifest_path, {}).get("sources", {})
+        packages = load_json(self.output_json, {"tour_packages": []})["tour_packages"]
+        changed, unchanged, removed, hashes = self.scan(manifest, full)
+
+        if not changed and not removed:
+            print(f"✅ {self.output_json} is up to date ({len(hashes)} pages unchanged)")
+            return packages
+
+        catalog = self.keyed_catalog(packages, manifest)
+        owned = {src: manifest[src]["key"] for src in unchanged}
+        for src in removed + changed:
+            if src in manifest:
+                catalog.pop(manifest[src]["key"], None)
+
+        # A page's package_link replaces the catalog entry with that link unless another
+        # page already owns it; duplicated links fall back to the page path.
+        taken = set(owned.values())
+        paths = [os.path.join(self.input_dir, src) for src in changed]
+        for path, record in extract_files(paths, workers=workers):
+            src = os.path.relpath(path, self.input_dir)
+            if not record:
+                continue
+            key = package_key(record, src, taken)
+            taken.add(key)
+            catalog[key] = record
+            owned[src] = key
+            manifest[src] = {"hash": hashes[src], "key": key, "record": record_hash(record)}
+
+        write_catalog(list(catalog.values()), self.output_json)
+        write_json_atomic(self.manifest_path, {
+            "sources": {src: manifest[src] for src in sorted(owned)}
+        })
+        print(f"✅ Updated {self.output_json}: {len(changed)} page(s) re-extracted, "
+              f"{len(removed)} removed, {len(unchanged)} unchanged in {time.perf_counter() - start:.1f}s")
+        return list(catalog.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally rebuild the package catalog from scraped pages.")
+    parser.add_argument("input_dir", help="Directory of scraped .txt pages")
+    parser.add_argument("--output", default="tour_packages.json", help="Catalog file to update")
+    parser.add_argument("--manifest", default=MANIFEST_FILE, help="Content-hash manifest file")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--pattern", default="*.txt", help="File name pattern to pick up")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-extract every page")
+    args = parser.parse_args(argv)
+
+    builder = CatalogBuilder(args.input_dir, args.output, args.manifest, args.pattern)
+    try:
+        builder.build(workers=args.workers, full=args.full)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Roughly one point per horizontal pixel of a wide Streamlit chart.
+DEFAULT_WIDTH = 1200
+# Above this many points in view, Plotly renders through WebGL instead of SVG.
+WEBGL_THRESHOLD = 5000
+CACHE_SIZE = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling; keeps the first, last and most salient points."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    x_num = _as_numeric(x)
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x_num[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x_num[a] - avg_x) * (y[start:end] - y[a])
+            - (x_num[a] - x_num[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+
+def reduce_series(x, y, key=None, width=DEFAULT_WIDTH, x_range=None):
+    """Clip a series to the visible range and downsample it to screen resolution.
+
+    Returns (x, y, points_in_view). When `key` identifies the dataset, the reduced
+    series is cached per (key, zoom range, width).
+    """
+    cache_key = None
+    if key is not None:
+        cache_key = (key, _range_key(x_range), width)
+        with _cache_lock:
+            if cache_key in _cache:
+                _cache.move_to_end(cache_key)
+                return _cache[cache_key]
+
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+
+    if x_range is not None:
+        order = np.argsort(x, kind='stable')
+        x, y = x[order], y[order]
+        if np.issubdtype(x.dtype, np.datetime64):
+            low, high = (np.datetime64(pd.Timestamp(v)) for v in x_range)
+        else:
+            low, high = x_range
+        start, stop = np.searchsorted(x, low, side='left'), np.searchsorted(x, high, side='right')
+        x, y = x[start:stop], y[start:stop]
+
+    points_in_view = len(x)
+    reduced = lttb(x, y, width) + (points_in_view,)
+
+    if cache_key is not None:
+        with _cache_lock:
+            _cache[cache_key] = reduced
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return reduced
+
+
+def line_trace(x, y, name, key=None, width=DEFAULT_WIDTH, x_range=None, mode='lines', **kwargs):
+    """Build a Plotly line trace, downsampled and switched to WebGL for large series."""
+    x_reduced, y_reduced, points_in_view = reduce_series(x, y, key=key, width=width, x_range=x_range)
+    trace_type = go.Scattergl if points_in_view > WEBGL_THRESHOLD else go.Scatter
+    return trace_type(x=x_reduced, y=y_reduced, name=name, mode=mode, **kwargs)
+
+
+def line_figure(df, x, y_columns, title, key=None, width=DEFAULT_WIDTH, x_range=None, mode='lines'):
+    """Equivalent of px.line(df, x=x, y=y_columns) built from reduced traces."""
+    if isinstance(y_columns, str):
+        y_columns = [y_columns]
+    fig = go.Figure()
+    for column in y_columns:
+        trace_key = (key, column) if key is not None else None
+        fig.add_trace(line_trace(df[x], df[column], column, key=trace_key, width=width, x_range=x_range, mode=mode))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y_columns[0] if len(y_columns) == 1 else 'value')
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    return fig
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _as_numeric(x):
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def _range_key(x_range):
+    if x_range is None:
+        return None
+    return tuple(str(pd.Timestamp(v)) if not isinstance(v, (int, float)) else v for v in x_range)
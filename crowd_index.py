@@ -0,0 +1,175 @@
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from crowd_levels import MAX_LEVEL, UNKNOWN
+from geo_index import get_gazetteer, normalize_place
+
+CROWD_INDEX_FILE = "crowd_index.npz"
+TRENDS_FILE = "Google_Trends_past_5.csv"
+# Furthest week after the last observed one that may be forecast; beyond this the models only extrapolate trend
+MAX_HORIZON_WEEKS = 26
+# Weeks of recent history that define a destination's usual week
+BASELINE_WEEKS = 52
+
+
+def forecast_place(filename, place_name, start, weeks):
+    """Crowd levels for one destination: weekly forecast relative to its typical week over the past year.
+
+    Levels compare search interest on its original scale (the min-max normalised series the models
+    work on exaggerates ratios), weighted by the predictor's seasonal and holiday factors.
+    """
+    import pandas as pd
+    from arima1 import VisitorPredictor
+    predictor = VisitorPredictor(seed=0)
+    predictor.predict(filename, place_name, start.strftime("%d-%m-%Y"), steps=weeks)  # fits the models
+
+    raw = predictor.load_data(filename, place_name).set_index("Week")[place_name]
+    low, high = raw.min(), raw.max()
+    forecast_weeks = pd.date_range(pd.Timestamp(start), periods=weeks, freq="7D")
+    hw, arima, _ = predictor.model_values(raw.index[-1], forecast_weeks)
+    future = (hw + arima) / 2
+    if high > low:
+        future = future * (high - low) / 100 + low
+    recent = raw.values[-BASELINE_WEEKS:]
+    # Trend extrapolation can run far past anything observed; keep it within the past year's range
+    future = np.clip(future, recent.min(), recent.max())
+
+    region = predictor.calendar.region_for(place_name)
+    recent_weeks = raw.index[-BASELINE_WEEKS:]
+    future = future * _week_factors(predictor, forecast_weeks, region)
+    recent = recent * _week_factors(predictor, recent_weeks, region)
+    baseline = np.median(recent)
+    if not baseline > 0:
+        return place_name, None
+    return place_name, future / baseline * 100
+
+
+def _week_factors(predictor, weeks, region):
+    seasonal = np.array([predictor.seasonal_factors.get(predictor.peak_seasons.get(week.month, 'regular'), 1.0)
+                         for week in weeks])
+    holidays = np.asarray(predictor.calendar.holiday_in_week(weeks, region=region), dtype=bool)
+    return seasonal * np.where(holidays, predictor.holiday_factor, 1.0)
+
+
+def trend_places(filename=TRENDS_FILE):
+    import pandas as pd
+    return [column.strip() for column in pd.read_csv(filename, nrows=0).columns if column != "Week"]
+
+
+def last_observed_week(filename=TRENDS_FILE):
+    import pandas as pd
+    weeks = pd.to_datetime(pd.read_csv(filename, usecols=["Week"])["Week"], format="%d-%m-%Y", errors="coerce")
+    return weeks.max().date()
+
+
+class CrowdIndex:
+    def __init__(self, places, start, levels):
+        """Expected crowd level per destination (rows) per week (columns) from `start`, as uint8."""
+        self.places = list(places)
+        self.start = start
+        self.levels = np.asarray(levels, dtype=np.uint8)
+        self.rows = {normalize_place(place): row for row, place in enumerate(self.places)}
+        self._location_rows = {}
+
+    @property
+    def weeks(self):
+        return self.levels.shape[1]
+
+    @classmethod
+    def build(cls, filename=TRENDS_FILE, start=None, weeks=26, places=None, workers=None):
+        start = start or date.today()
+        last_week = last_observed_week(filename)
+        end = start + timedelta(weeks=weeks - 1)
+        if (end - last_week).days > MAX_HORIZON_WEEKS * 7:
+            raise ValueError(f"{filename} ends on {last_week:%d-%m-%Y}; forecasting through {end:%d-%m-%Y} is more "
+                             f"than {MAX_HORIZON_WEEKS} weeks past the data. Refresh the trends export, pass an "
+                             f"earlier --start or fewer --weeks.")
+        places = places or trend_places(filename)
+        levels = np.full((len(places), weeks), UNKNOWN, dtype=np.uint8)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {place: pool.submit(forecast_place, filename, place, start, weeks) for place in places}
+            for row, place in enumerate(places):
+                try:
+                    _, relative = futures[place].result()
+                except Exception as e:
+                    print(f"⚠️ No crowd forecast for {place}: {e}")
+                    continue
+                if relative is not None:
+                    levels[row] = np.clip(np.round(relative), 0, MAX_LEVEL).astype(np.uint8)
+                    print(f"✅ {place}")
+        return cls(places, start, levels)
+
+    def save(self, path=CROWD_INDEX_FILE):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            np.savez_compressed(file, places=np.array(self.places), levels=self.levels,
+                                start=np.datetime64(self.start, "D"))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CROWD_INDEX_FILE):
+        with np.load(path) as data:
+            start = data["start"].astype("datetime64[D]").item()
+            return cls(data["places"].tolist(), start, data["levels"])
+
+    def week_column(self, when):
+        """Column for the week containing `when`, or None outside the forecast horizon."""
+        if isinstance(when, str):
+            when = date.fromisoformat(when[:10])
+        if isinstance(when, datetime):
+            when = when.date()
+        column = (when - self.start).days // 7
+        return column if 0 <= column < self.weeks else None
+
+    def rows_for_location(self, location):
+        """Index rows for a package location; specific places first, then any region named in it."""
+        key = str(location)
+        if key not in self._location_rows:
+            resolved = [self.rows[normalize_place(name)] for name, _, _ in get_gazetteer().resolve(location)
+                        if normalize_place(name) in self.rows]
+            if not resolved:
+                parts = location if isinstance(location, (list, tuple)) else [location]
+                text = " " + " ".join(normalize_place(str(part)) for part in parts) + " "
+                resolved = [row for name, row in self.rows.items() if f" {name} " in text]
+            self._location_rows[key] = tuple(resolved)
+        return self._location_rows[key]
+
+    def level(self, rows, when):
+        """Busiest expected level across the given rows in the week of `when`, or None if unknown."""
+        column = self.week_column(when)
+        if column is None or not rows:
+            return None
+        values = self.levels[list(rows), column]
+        values = values[values != UNKNOWN]
+        return int(values.max()) if len(values) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute expected crowd levels per destination per week.")
+    parser.add_argument("--trends", default=TRENDS_FILE, help="Weekly Google Trends CSV")
+    parser.add_argument("--start", help="First forecast week (dd-mm-YYYY, default: today)")
+    parser.add_argument("--weeks", type=int, default=26, help="Weeks to forecast")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel model fits (default: CPU count)")
+    parser.add_argument("--output", default=CROWD_INDEX_FILE, help="Where to write the index")
+    args = parser.parse_args(argv)
+
+    start = datetime.strptime(args.start, "%d-%m-%Y").date() if args.start else date.today()
+    try:
+        index = CrowdIndex.build(args.trends, start=start, weeks=args.weeks, workers=args.workers)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    index.save(args.output)
+    print(f"✅ Saved crowd levels for {len(index.places)} places x {index.weeks} weeks to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+# Levels are expected visitors as a percentage of the destination's typical week (100 = usual).
+# Kept apart from crowd_index.py so the Streamlit pages can show the filter without loading numpy.
+UNKNOWN = 255
+MAX_LEVEL = 254
+CROWD_LABELS = {"Quiet": 90, "Normal": 120, "Busy": 160}
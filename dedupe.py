@@ -0,0 +1,221 @@
+import argparse
+import json
+import re
+import sys
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_SIZE = 2
+# Estimated Jaccard similarity above which two candidate packages count as the same tour.
+# Different tours from one seller share boilerplate inclusions and score up to ~0.75.
+THRESHOLD = 0.8
+COMPLETENESS_FIELDS = (
+    "name", "location", "price", "duration", "activities", "rating", "available_dates", "meal_plan",
+    "transport_type", "max_group_size", "seller", "package_link", "includes", "excludes", "itinerary"
+)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _field(record, name):
+    """Read a field from a catalog dict or a TourPackage alike."""
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name, None)
+
+
+def _as_text(value):
+    if not value:
+        return ""
+    if isinstance(value, dict):
+        return " ".join(str(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def record_text(record):
+    """Text that identifies a tour: name, location, itinerary and inclusions."""
+    return " ".join(_as_text(_field(record, name)) for name in ("name", "location", "itinerary", "includes"))
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Hashed word n-grams of the normalised text."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    return np.unique(np.array([zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.uint64))
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        """MinHash signatures using multiply-shift hashing, vectorised over all permutations."""
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def signature(self, record):
+        """MinHash signature of the record's identity text, or None if it has no text to compare."""
+        hashed = shingles(record_text(record))
+        if len(hashed) == 0:
+            return None
+        # (a * x + b) mod 2**64, top 32 bits: uint64 arithmetic wraps, which is what we want here.
+        with np.errstate(over="ignore"):
+            permuted = (self._a[:, None] * hashed[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = []
+        self.members = {}
+
+    def add(self):
+        pos = len(self.parent)
+        self.parent.append(pos)
+        self.members[pos] = [pos]
+        return pos
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            root, child = min(root_i, root_j), max(root_i, root_j)
+            self.parent[child] = root
+            self.members[root].extend(self.members.pop(child))
+
+
+def completeness(record):
+    return sum(1 for name in COMPLETENESS_FIELDS if _field(record, name) not in (None, "", [], {}))
+
+
+def canonical_rank(record):
+    """Sort key for the record kept from a cluster: most complete, then best rated, then cheapest."""
+    rating = _field(record, "rating") or 0.0
+    price = _field(record, "price")
+    return -completeness(record), -rating, price if price else float("inf")
+
+
+class DedupeIndex:
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        """Incremental LSH index: records are clustered with earlier near-duplicates as they are added."""
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, seed)
+        self.records = []
+        self._signatures = np.empty((64, num_perm), dtype=np.uint64)
+        self._buckets = [{} for _ in range(bands)]
+        self._clusters = _UnionFind()
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record):
+        """Index a record; returns its position and the positions it was found to duplicate."""
+        signature = self.hasher.signature(record)
+        pos = self._clusters.add()
+        self.records.append(record)
+        if pos == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        if signature is None:
+            # Nothing identifies this record, so it is never taken for a duplicate of anything.
+            self._signatures[pos] = _MAX_HASH
+            return pos, []
+        self._signatures[pos] = signature
+
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            members = buckets.setdefault(key, [])
+            candidates.update(members)
+            members.append(pos)
+
+        if not candidates:
+            return pos, []
+        # Verify all candidates at once against the stored signatures.
+        others = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+        similarity = (self._signatures[others] == signature).mean(axis=1)
+        matches = sorted(others[similarity >= self.threshold].tolist())
+        for other in matches:
+            self._clusters.union(pos, other)
+        return pos, matches
+
+    @property
+    def signatures(self):
+        return self._signatures[:len(self.records)]
+
+    def cluster_of(self, pos):
+        return self._clusters.find(pos)
+
+    def members(self, pos):
+        """Positions in the same cluster as `pos`."""
+        return sorted(self._clusters.members[self._clusters.find(pos)])
+
+    def clusters(self):
+        """Clusters as lists of positions, ordered by their first member."""
+        # A cluster's root is always its lowest position.
+        return [sorted(members) for _, members in sorted(self._clusters.members.items())]
+
+    def canonical(self, members):
+        return min(members, key=lambda pos: (canonical_rank(self.records[pos]), pos))
+
+
+def dedupe_catalog(packages, threshold=THRESHOLD):
+    """Catalog with one canonical record per duplicate cluster, plus the clusters (as positions)."""
+    index = DedupeIndex(threshold)
+    for record in packages:
+        index.add(record)
+    clusters = index.clusters()
+    keep = sorted(index.canonical(members) for members in clusters)
+    return [packages[pos] for pos in keep], clusters
+
+
+def collapse_results(results, threshold=THRESHOLD):
+    """Collapse near-duplicate search results to their canonical record, keeping result order."""
+    if len(results) < 2:
+        return list(results)
+    index = DedupeIndex(threshold)
+    for record in results:
+        index.add(record)
+    # Clusters come out ordered by their first member, i.e. where the tour first appeared.
+    return [results[index.canonical(members)] for members in index.clusters()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove near-duplicate packages from a catalog.")
+    parser.add_argument("catalog", nargs="?", default="tour_packages.json", help="Catalog to deduplicate")
+    parser.add_argument("--output", help="Where to write the result (default: report only)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Similarity needed to merge")
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, "r", encoding="utf-8") as file:
+        packages = json.load(file)["tour_packages"]
+    kept, clusters = dedupe_catalog(packages, args.threshold)
+    for members in clusters:
+        if len(members) > 1:
+            print("🔁 " + " | ".join(str(_field(packages[pos], "name")) for pos in members))
+    print(f"✅ {len(packages)} packages -> {len(kept)} after removing near-duplicates")
+
+    if args.output:
+        # Imported here: batch_formatter itself imports this module for --dedupe.
+        from batch_formatter import write_catalog
+        write_catalog(kept, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
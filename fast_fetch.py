@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from package_extractor import DURATION, PRICE
+from scraping_engine import ScrapeResult, ScraperPool, output_filename, read_urls
+
+CACHE_DIR = ".fetch_cache"
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) TourismPackageFetcher/1.0"
+# Pages with less visible text than this are probably rendered client-side.
+MIN_TEXT_CHARS = 500
+# Markup of an empty client-side app shell.
+JS_MARKERS = (
+    "please enable javascript",
+    "you need to enable javascript",
+    '<div id="root"></div>',
+    '<div id="__next"></div>',
+    '<div id="app"></div>'
+)
+# Package details every usable page of a site has; if the static text lacks any of them, the page is
+# rendered client-side. Sites not listed here are judged by text length and app-shell markers only.
+SITE_REQUIRED_CONTENT = {
+    "yatra.com": (PRICE, DURATION)
+}
+
+BLOCK_TAGS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "header", "footer", "table"}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "noscript", "template"):
+            self._skip += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "noscript", "template"):
+            self._skip = max(0, self._skip - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    """Visible text of a page, one line per block element (close to Selenium's body.text)."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def site_required_content(url):
+    """Patterns the static text of a page from this URL's site must match; () for sites without any."""
+    host = (urlsplit(url).hostname or "").lower()
+    for site, patterns in SITE_REQUIRED_CONTENT.items():
+        if host == site or host.endswith("." + site):
+            return patterns
+    return ()
+
+
+def needs_javascript(html, text, required=()):
+    """True when the static page is missing package content that a browser would render."""
+    if len(text) < MIN_TEXT_CHARS or not all(pattern.search(text) for pattern in required):
+        return True
+    lowered = html.lower()
+    return any(marker in lowered for marker in JS_MARKERS)
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        """On-disk page cache with the validators needed for conditional requests."""
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.html")
+
+    def get(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            with open(body_path, "r", encoding="utf-8") as file:
+                return meta, file.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, etag, last_modified, body):
+        meta_path, body_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        for path, content in ((body_path, body), (meta_path, json.dumps(meta))):
+            with open(path + ".tmp", "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(path + ".tmp", path)
+
+
+class _HostLimiter:
+    def __init__(self, per_host, min_interval):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self._slots = {}
+        self._locks = {}
+        self._last_request = {}
+
+    async def wait(self, host):
+        """Take one of the host's connection slots and respect its minimum request spacing."""
+        if host not in self._slots:
+            self._slots[host] = asyncio.Semaphore(self.per_host)
+            self._locks[host] = asyncio.Lock()
+        await self._slots[host].acquire()
+        async with self._locks[host]:
+            delay = self._last_request.get(host, 0) + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_request[host] = time.monotonic()
+
+    def release(self, host):
+        self._slots[host].release()
+
+
+class FastFetcher:
+    def __init__(self, concurrency=20, per_host=4, min_interval=0.25, timeout=20, cache_dir=CACHE_DIR,
+                 required_content=None):
+        """Fetch static package pages over pooled keep-alive connections with revalidating cache.
+
+        `required_content` is a tuple of patterns every page must match to skip the browser;
+        by default each page is checked against its site's entry in SITE_REQUIRED_CONTENT.
+        """
+        self.required_content = required_content
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.cache = ResponseCache(cache_dir)
+        self._limiter = None
+
+    def open_session(self):
+        """Pooled keep-alive session for a batch of fetches; use with `async with`."""
+        self._limiter = _HostLimiter(self.per_host, self.min_interval)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT})
+
+    async def fetch_all(self, urls):
+        """Async generator of (ScrapeResult, needs_browser) in completion order."""
+        async with self.open_session() as session:
+            tasks = [asyncio.ensure_future(self.fetch(session, url)) for url in urls]
+            for task in asyncio.as_completed(tasks):
+                yield await task
+
+    async def fetch(self, session, url):
+        """Fetch one page on a session from open_session(); returns (ScrapeResult, needs_browser)."""
+        limiter = self._limiter
+        start = time.perf_counter()
+        meta, cached_body = self.cache.get(url)
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        host = urlsplit(url).netloc
+        await limiter.wait(host)
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and cached_body is not None:
+                    body, source = cached_body, "cache"
+                elif response.status == 200:
+                    try:
+                        body, source = await response.text(), "http"
+                    except UnicodeDecodeError as e:
+                        # Wrong or missing charset; a browser copes with these, so hand the page over
+                        return ScrapeResult(url, error=f"Could not decode page: {e.reason}", attempts=1,
+                                            elapsed=time.perf_counter() - start, source="http"), True
+                    self.cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), body)
+                else:
+                    return ScrapeResult(url, error=f"HTTP {response.status}", attempts=1,
+                                        elapsed=time.perf_counter() - start, source="http"), False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return ScrapeResult(url, error=f"Request failed: {e!r}", attempts=1,
+                                elapsed=time.perf_counter() - start, source="http"), False
+        finally:
+            limiter.release(host)
+
+        text = html_to_text(body)
+        result = ScrapeResult(url, text=text, attempts=1, elapsed=time.perf_counter() - start, source=source)
+        required = self.required_content if self.required_content is not None else site_required_content(url)
+        return result, needs_javascript(body, text, required)
+
+
+async def _fetch_pages_async(urls, fetcher, use_browser, on_result):
+    browser_urls = []
+    async for result, needs_browser in fetcher.fetch_all(urls):
+        if needs_browser and use_browser:
+            browser_urls.append(result.url)
+        else:
+            on_result(result)
+    return browser_urls
+
+
+def fetch_pages(urls, on_result, browser_workers=2, use_browser=True, **fetcher_options):
+    """Fetch pages over plain HTTP, falling back to Selenium only for pages that need JavaScript.
+
+    `on_result` is called with each ScrapeResult as soon as it is ready.
+    """
+    fetcher = FastFetcher(**fetcher_options)
+    browser_urls = asyncio.run(_fetch_pages_async(urls, fetcher, use_browser, on_result))
+    if browser_urls:
+        print(f"🌐 {len(browser_urls)} page(s) need JavaScript; rendering with Selenium", file=sys.stderr)
+        with ScraperPool(workers=browser_workers) as pool:
+            for result in pool.scrape(browser_urls):
+                on_result(result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch tour package pages, using a browser only when needed.")
+    parser.add_argument("urls", nargs="*", help="Package page URLs")
+    parser.add_argument("--file", help="Text file with one URL per line")
+    parser.add_argument("--concurrency", type=int, default=20, help="Total open connections")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent requests per host")
+    parser.add_argument("--min-interval", type=float, default=0.25, help="Seconds between requests to one host")
+    parser.add_argument("--browser-workers", type=int, default=2, help="Browser sessions for JavaScript pages")
+    parser.add_argument("--no-browser", action="store_true", help="Never fall back to Selenium")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Response cache directory")
+    parser.add_argument("--output-dir", help="Write each page's text to its own file here "
+                                             "(default: stream JSON lines to stdout)")
+    args = parser.parse_args(argv)
+
+    urls = read_urls(args.urls, args.file)
+    if not urls:
+        parser.error("no URLs given")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failures = []
+
+    def write(result):
+        if not result.ok():
+            failures.append(result.url)
+        if args.output_dir and result.ok():
+            path = os.path.join(args.output_dir, output_filename(result.url))
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(result.text)
+            print(f"✅ {result.url} -> {path} ({result.source}, {result.elapsed:.2f}s)", file=sys.stderr)
+        elif not args.output_dir:
+            print(json.dumps(result.to_dict(), ensure_ascii=False), flush=True)
+
+    fetch_pages(urls, write, browser_workers=args.browser_workers, use_browser=not args.no_browser,
+                concurrency=args.concurrency, per_host=args.per_host, min_interval=args.min_interval,
+                cache_dir=args.cache_dir)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ForecastCancelled(Exception):
+    """Raised inside a forecast job when it has been cancelled."""
+
+
+class ForecastJob:
+    def __init__(self, key):
+        """Track the state of one background forecast."""
+        self.key = key
+        self.future = None
+        self.progress = 0.0
+        self.status = "Queued"
+        self.cancel_event = threading.Event()
+        self.subscribers = 1
+        self.finished_at = None
+
+    def update(self, progress, status):
+        """Progress callback handed to the forecasting code."""
+        self.progress = min(max(progress, 0.0), 1.0)
+        self.status = status
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def result(self):
+        return self.future.result()
+
+    def error(self):
+        if not self.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+
+class ForecastJobManager:
+    def __init__(self, max_workers=2, max_pending=8, result_ttl=600):
+        """Run forecasts on a bounded pool, coalescing identical in-flight requests."""
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forecast")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Start `fn` for `key`, or join the job already running (or recently finished) for it."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and not job.cancelled() and job.error() is None:
+                job.subscribers += 1
+                return job
+
+            pending = sum(1 for j in self._jobs.values() if not j.done())
+            if pending >= self.max_pending:
+                raise RuntimeError("Too many forecasts are running right now. Please try again shortly.")
+
+            job = ForecastJob(key)
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+            self._jobs[key] = job
+            return job
+
+    def get(self, key):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(key)
+
+    def cancel(self, key):
+        """Drop one subscriber; the job is only cancelled once nobody is waiting on it."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.done():
+                return False
+            job.subscribers -= 1
+            if job.subscribers > 0:
+                return False
+            job.cancel_event.set()
+            job.status = "Cancelling"
+            if job.future.cancel():
+                job.status = "Cancelled"
+                job.finished_at = time.time()
+            return True
+
+    def shutdown(self):
+        """Stop accepting work and cancel queued forecasts; running ones finish in the background."""
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled():
+            raise ForecastCancelled("Forecast cancelled before it started.")
+        job.update(0.0, "Starting")
+        try:
+            result = fn(*args, progress_callback=job.update, cancel_event=job.cancel_event, **kwargs)
+            job.update(1.0, "Done")
+            return result
+        except ForecastCancelled:
+            job.status = "Cancelled"
+            raise
+        except Exception:
+            job.status = "Failed"
+            raise
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        now = time.time()
+        expired = [key for key, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.result_ttl]
+        for key in expired:
+            del self._jobs[key]
@@ -0,0 +1,159 @@
+import csv
+import heapq
+import math
+import re
+from functools import lru_cache
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.19
+# Grid cell size in degrees (~55 km of latitude); small enough that a 100 km search touches a handful of cells.
+CELL_DEGREES = 0.5
+_SPLIT = re.compile(r"\s*(?:,|&|/|\band\b)\s*")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def normalize_place(name):
+    return " ".join(re.sub(r"[^a-z0-9& ]", " ", name.lower().replace("-", " ")).split())
+
+
+class Gazetteer:
+    def __init__(self, filename="gazetteer.csv"):
+        """Offline place-name lookup: name or alias -> (name, latitude, longitude, type)."""
+        self.places = {}
+        with open(filename, "r", encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                entry = (row["Name"], float(row["Latitude"]), float(row["Longitude"]), row["Type"])
+                for name in [row["Name"]] + [a for a in (row.get("Aliases") or "").split(";") if a]:
+                    self.places.setdefault(normalize_place(name), entry)
+        # Longest names first so "Old Manali" wins over "Manali" when scanning free text.
+        self._by_length = sorted(self.places, key=len, reverse=True)
+        self._matches = {}
+
+    def _match(self, key):
+        """Gazetteer entries named in one normalised location fragment (memoised; catalogs repeat them)."""
+        if key not in self._matches:
+            if key in self.places:
+                entries = [self.places[key]]
+            else:
+                entries = []
+                padded = f" {key} "
+                for name in self._by_length:
+                    if f" {name} " in padded:
+                        entries.append(self.places[name])
+                        padded = padded.replace(f" {name} ", " | ")
+            self._matches[key] = entries
+        return self._matches[key] if key else []
+
+    def lookup(self, name):
+        """(latitude, longitude) of a place name or alias, or None."""
+        entry = self.places.get(normalize_place(name))
+        return (entry[1], entry[2]) if entry else None
+
+    def resolve(self, location):
+        """Places named in a package location ("Munnar & Thekkady, Kerala" or a list of names).
+
+        States only count when nothing more specific is named.
+        """
+        parts = location if isinstance(location, (list, tuple)) else _SPLIT.split(str(location or ""))
+        found = {}
+        for part in parts:
+            for entry in self._match(normalize_place(str(part))):
+                found[entry[0]] = entry
+        specific = [e for e in found.values() if e[3] != "state"]
+        return [(name, lat, lon) for name, lat, lon, _ in (specific or list(found.values()))]
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer(filename="gazetteer.csv"):
+    return Gazetteer(filename)
+
+
+class GeoIndex:
+    def __init__(self, cell_degrees=CELL_DEGREES):
+        """Uniform lat/lon grid of (item, latitude, longitude) points; an item may have several points."""
+        self.cell_degrees = cell_degrees
+        self.cells = {}
+        self.size = 0
+        self._bounds = None  # (min_lat_cell, max_lat_cell, min_lon_cell, max_lon_cell)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def add(self, item, lat, lon):
+        cell = self._cell(lat, lon)
+        self.cells.setdefault(cell, []).append((item, lat, lon))
+        self.size += 1
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[0], cell[1], cell[1])
+        else:
+            low_lat, high_lat, low_lon, high_lon = self._bounds
+            self._bounds = (min(low_lat, cell[0]), max(high_lat, cell[0]), min(low_lon, cell[1]), max(high_lon, cell[1]))
+
+    def remove(self, item, lat, lon):
+        """Drop one point added with add(); the search bounds are left as they are."""
+        cell = self._cell(lat, lon)
+        points = self.cells.get(cell, [])
+        if (item, lat, lon) in points:
+            points.remove((item, lat, lon))
+            self.size -= 1
+            if not points:
+                del self.cells[cell]
+
+    def _nearest_in(self, cells, lat, lon, best):
+        for cell in cells:
+            for item, p_lat, p_lon in self.cells.get(cell, ()):
+                distance = haversine_km(lat, lon, p_lat, p_lon)
+                if distance < best.get(item, math.inf):
+                    best[item] = distance
+
+    def within(self, lat, lon, radius_km):
+        """{item: distance_km} for items with a point within radius_km of (lat, lon)."""
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + lat_span, 89.9))), 1e-6))
+        low_lat, low_lon = self._cell(lat - lat_span, lon - lon_span)
+        high_lat, high_lon = self._cell(lat + lat_span, lon + lon_span)
+        if (high_lat - low_lat + 1) * (high_lon - low_lon + 1) > len(self.cells):
+            cells = list(self.cells)
+        else:
+            cells = [(i, j) for i in range(low_lat, high_lat + 1) for j in range(low_lon, high_lon + 1)]
+        best = {}
+        self._nearest_in(cells, lat, lon, best)
+        return {item: d for item, d in best.items() if d <= radius_km}
+
+    def nearest(self, lat, lon, k):
+        """The k items closest to (lat, lon) as (item, distance_km), nearest first."""
+        if not self.cells or k <= 0:
+            return []
+        center_lat, center_lon = self._cell(lat, lon)
+        low_lat, high_lat, low_lon, high_lon = self._bounds
+        max_ring = max(abs(center_lat - low_lat), abs(center_lat - high_lat),
+                       abs(center_lon - low_lon), abs(center_lon - high_lon))
+        best = {}
+        for ring in range(max_ring + 1):
+            self._nearest_in(self._ring(center_lat, center_lon, ring), lat, lon, best)
+            if len(best) >= k:
+                kth = heapq.nsmallest(k, best.values())[-1]
+                # Anything in an outer ring is at least `ring` whole cells away.
+                edge_lat = min(abs(lat) + (ring + 1) * self.cell_degrees, 89.9)
+                bound = ring * self.cell_degrees * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+                if kth <= bound:
+                    break
+        return heapq.nsmallest(k, best.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def _ring(center_lat, center_lon, ring):
+        if ring == 0:
+            return [(center_lat, center_lon)]
+        cells = []
+        for i in range(center_lat - ring, center_lat + ring + 1):
+            cells.append((i, center_lon - ring))
+            cells.append((i, center_lon + ring))
+        for j in range(center_lon - ring + 1, center_lon + ring):
+            cells.append((center_lat - ring, j))
+            cells.append((center_lat + ring, j))
+        return cells
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+
+NATIONAL = "IN"
+
+# State/UT code used for regional holidays of each forecast location.
+PLACE_REGIONS = {
+    "Taj Mahal": "UP", "Red Fort": "DL", "Jaipur": "RJ", "Varanasi": "UP",
+    "Goa": "GA", "Kerala": "KL", "Munnar": "KL", "Hyderabad": "TG",
+    "Coorg": "KA", "Golden Temple": "PB", "Maha Kumbh": "UP",
+    "Manali": "HP", "Shimla": "HP", "Darjeeling": "WB", "Ooty": "TN",
+    "Leh-Ladakh": "LA", "Nainital": "UK", "Gulmarg": "JK", "Hampi": "KA",
+    "Ajanta & Ellora Caves": "MH", "Khajuraho": "MP", "Jaisalmer": "RJ",
+    "Amer Fort": "RJ", "Mysore Palace": "KA", "Konark Sun Temple": "OR",
+    "Rameswaram": "TN", "Vaishno Devi": "JK", "Tirupati": "AP",
+    "Somnath Temple": "GJ", "Dwarka": "GJ", "Puri Jagannath Temple": "OR",
+    "Ujjain Mahakaleshwar Temple": "MP", "Andaman & Nicobar Islands": "AN",
+    "Lakshadweep": "LD", "Gokarna": "KA", "Pondicherry": "PY"
+}
+
+
+class HolidayCalendar:
+    def __init__(self, filename="holidays.csv"):
+        """Load holidays (dd-mm-YYYY, name, region) into sorted day arrays per region."""
+        df = pd.read_csv(filename)
+        df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y')
+        self._by_region = {
+            region: np.unique(group['Date'].values.astype('datetime64[D]'))
+            for region, group in df.groupby('Region')
+        }
+        self._merged = {}
+
+    def region_for(self, place_name):
+        return PLACE_REGIONS.get(place_name)
+
+    def dates(self, region=None):
+        """Sorted holiday days for a region, always including national holidays."""
+        key = region or NATIONAL
+        if key not in self._merged:
+            national = self._by_region.get(NATIONAL, np.array([], dtype='datetime64[D]'))
+            regional = self._by_region.get(key, np.array([], dtype='datetime64[D]'))
+            self._merged[key] = np.union1d(national, regional)
+        return self._merged[key]
+
+    def is_holiday(self, dates, region=None):
+        """Boolean array: is each date itself a holiday."""
+        days = _to_days(dates)
+        holidays = self.dates(region)
+        if len(holidays) == 0:
+            return np.zeros(len(days), dtype=bool)
+        idx = np.searchsorted(holidays, days)
+        return holidays[np.minimum(idx, len(holidays) - 1)] == days
+
+    def holiday_in_week(self, week_starts, region=None):
+        """Boolean array: does the 7-day window starting at each date contain a holiday."""
+        days = _to_days(week_starts)
+        holidays = self.dates(region)
+        first = np.searchsorted(holidays, days, side='left')
+        last = np.searchsorted(holidays, days + np.timedelta64(7, 'D'), side='left')
+        return last > first
+
+
+def _to_days(dates):
+    return np.asarray(pd.to_datetime(dates)).astype('datetime64[D]')
+
+
+@lru_cache(maxsize=None)
+def get_calendar(filename="holidays.csv"):
+    """Process-wide calendar shared by the forecasting modules."""
+    return HolidayCalendar(filename)
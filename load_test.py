@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import psutil
+
+from crowd_index import MAX_HORIZON_WEEKS, last_observed_week, trend_places
+from tourism_recommendation import TourismRecommender
+
+CATALOG_FILE = "tour_packages.json"
+TRENDS_FILE = "Google_Trends_past_5.csv"
+FORECAST_STEPS = 4  # weeks each forecast covers from its start, VisitorPredictor.predict's default
+DEFAULT_MIX = "search=8,facets=1,forecast=1"
+DEFAULT_LEVELS = "1,2,4,8,16,32"
+PERCENTILES = (50, 95, 99)
+
+
+def log(message):
+    print(message, flush=True)
+
+
+def parse_mix(text):
+    """"search=8,forecast=1" -> {"search": 8.0, "forecast": 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("search", "facets", "forecast"):
+            raise ValueError(f"Unknown operation '{name}' in mix; use search, facets or forecast.")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Workload:
+    def __init__(self, recommender, places, mix, seed=0, forecast_keys=20, first_week=None):
+        """Random but reproducible requests drawn from the real catalog and trends places.
+
+        Forecasts cycle through `forecast_keys` distinct (place, week) pairs, like real traffic
+        that keeps asking about the same popular destinations. Their weeks start at `first_week`
+        (the week after the trends data ends) and each window ends within MAX_HORIZON_WEEKS of the data.
+        """
+        self.rng = random.Random(seed)
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.locations = sorted({part.strip() for pkg in recommender.tour_packages
+                                 for loc in (pkg.location if isinstance(pkg.location, list) else [pkg.location])
+                                 for part in str(loc).replace("&", ",").split(",") if part.strip()})
+        bounds = recommender.range_bounds()
+        self.price = bounds.get("price") or [0, 50000]
+        first_week = first_week or date.today()
+        offsets = MAX_HORIZON_WEEKS - FORECAST_STEPS + 1
+        self.forecasts = [(self.rng.choice(places), first_week + timedelta(weeks=self.rng.randrange(offsets)))
+                          for _ in range(forecast_keys)] if places else []
+
+    def next(self):
+        op = self.rng.choices(self.ops, self.weights)[0]
+        if op == "forecast" and self.forecasts:
+            place, start = self.rng.choice(self.forecasts)
+            return op, {"place": place, "start": start.strftime("%d-%m-%Y")}
+        if op == "facets" or op == "forecast":
+            return "facets", {}
+        preferences = {}
+        if self.rng.random() < 0.5:
+            low = self.rng.uniform(self.price[0], self.price[1])
+            preferences["price_range"] = [round(low), round(self.rng.uniform(low, self.price[1]))]
+        if self.rng.random() < 0.3:
+            preferences["min_rating"] = self.rng.choice([3.5, 4.0, 4.5])
+        if self.rng.random() < 0.2:
+            preferences["collapse_duplicates"] = True
+        return "search", {"location": self.rng.choice(self.locations or ["India"]), "preferences": preferences}
+
+
+class InProcessTarget:
+    """Calls the recommender and VisitorPredictor directly in this process. Forecasts skip the
+    ForecastJobManager queue the Streamlit app puts in front of them, so identical requests are not coalesced."""
+
+    name = "in-process"
+
+    def __init__(self, recommender, trends_file=TRENDS_FILE, threads=64):
+        self.recommender = recommender
+        self.trends_file = trends_file
+        from arima1 import VisitorPredictor
+        self.predictor_class = VisitorPredictor
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="loadtest")
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _call(self, op, payload):
+        if op == "search":
+            preferences = dict(payload["preferences"])
+            if "price_range" in preferences:
+                preferences["price_range"] = tuple(preferences["price_range"])
+            return self.recommender.search_packages(payload["location"], preferences)
+        if op == "facets":
+            return self.recommender.get_unique_values()
+        return self.predictor_class().predict(self.trends_file, payload["place"], payload["start"])
+
+    async def call(self, op, payload):
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._call, op, payload)
+
+
+class HttpTarget:
+    """Sends the same operations to a running api_server.py over keep-alive connections."""
+
+    name = "http"
+
+    def __init__(self, base_url, timeout=120):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = None
+
+    async def open(self):
+        import aiohttp
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                             connector=aiohttp.TCPConnector(limit=0))
+
+    async def close(self):
+        await self.session.close()
+
+    async def call(self, op, payload):
+        if op == "facets":
+            request = self.session.get(f"{self.base_url}/facets")
+        else:
+            request = self.session.post(f"{self.base_url}/{op}", json=payload)
+        async with request as response:
+            await response.read()
+            if response.status >= 400:
+                raise RuntimeError(f"HTTP {response.status}")
+
+
+class ResourceSampler:
+    def __init__(self, pid=None, interval=0.5):
+        """Samples CPU% and RSS of a process (this one by default) in the background."""
+        self.process = psutil.Process(pid or os.getpid())
+        self.interval = interval
+        self.samples = []
+        self.level = None
+        self._task = None
+
+    async def _run(self, started):
+        self.process.cpu_percent(None)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.samples.append({
+                    "t": round(time.perf_counter() - started, 2), "concurrency": self.level,
+                    "cpu_percent": self.process.cpu_percent(None),
+                    "rss_mb": round(self.process.memory_info().rss / (1024 * 1024), 1)
+                })
+            except psutil.NoSuchProcess:
+                return
+
+    def start(self, started):
+        self._task = asyncio.create_task(self._run(started))
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self, level):
+        samples = [s for s in self.samples if s["concurrency"] == level]
+        if not samples:
+            return {"cpu_percent": None, "rss_mb": None}
+        return {"cpu_percent": round(float(np.mean([s["cpu_percent"] for s in samples])), 1),
+                "rss_mb": max(s["rss_mb"] for s in samples)}
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return {f"p{p}_ms": None for p in PERCENTILES}
+    values = np.percentile(np.asarray(latencies) * 1000, PERCENTILES)
+    return {f"p{p}_ms": round(float(v), 2) for p, v in zip(PERCENTILES, values)}
+
+
+async def run_level(target, workload, concurrency, duration, warmup):
+    """Closed loop: `concurrency` virtual users each send a request as soon as the last one returns."""
+    results = []
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    async def user():
+        while time.perf_counter() < stop_at:
+            op, payload = workload.next()
+            started = time.perf_counter()
+            error = None
+            try:
+                await target.call(op, payload)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            if started >= measure_from:
+                results.append((op, time.perf_counter() - started, error))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+
+    ok = [latency for _, latency, error in results if error is None]
+    errors = [error for _, _, error in results if error is not None]
+    level = {
+        "concurrency": concurrency, "requests": len(results), "errors": len(errors),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed > 0 else 0.0,
+        **latency_summary(ok), "by_operation": {}
+    }
+    for op in sorted({op for op, _, _ in results}):
+        op_ok = [latency for o, latency, error in results if o == op and error is None]
+        level["by_operation"][op] = {"requests": sum(1 for o, _, _ in results if o == op),
+                                     "errors": sum(1 for o, _, e in results if o == op and e is not None),
+                                     **latency_summary(op_ok)}
+    if errors:
+        level["sample_errors"] = sorted(set(errors))[:5]
+    return level
+
+
+async def run_load_test(target, workload, levels, duration, warmup=1.0, sampler=None, max_error_rate=0.5):
+    sampler = sampler or ResourceSampler()
+    started = time.perf_counter()
+    await target.open()
+    sampler.start(started)
+    report = {"target": target.name, "duration_per_level": duration, "levels": []}
+    try:
+        for concurrency in levels:
+            sampler.level = concurrency
+            level = await run_level(target, workload, concurrency, duration, warmup)
+            level.update(sampler.summary(concurrency))
+            report["levels"].append(level)
+            log(f"⏱️ c={concurrency:<4} {level['throughput_rps']:>8.1f} req/s  p50 {level['p50_ms']} ms  "
+                f"p95 {level['p95_ms']} ms  p99 {level['p99_ms']} ms  errors {level['errors']}  "
+                f"cpu {level['cpu_percent']}%  rss {level['rss_mb']} MB")
+            if level["requests"] and level["errors"] / level["requests"] > max_error_rate:
+                log(f"⚠️ Stopping: more than {max_error_rate:.0%} of requests failed at concurrency {concurrency}.")
+                break
+    finally:
+        sampler.level = None
+        await sampler.stop()
+        await target.close()
+    report["resources"] = sampler.samples
+    return report
+
+
+def compare(report, baseline, tolerance=0.2):
+    """Capacity regressions against an earlier report: p95 up or throughput down by more than `tolerance`."""
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    problems = []
+    for level in report["levels"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        if before.get("p95_ms") and level.get("p95_ms") and level["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            problems.append(f"c={level['concurrency']}: p95 {before['p95_ms']} -> {level['p95_ms']} ms")
+        if before.get("throughput_rps") and level["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            problems.append(f"c={level['concurrency']}: throughput "
+                            f"{before['throughput_rps']} -> {level['throughput_rps']} req/s")
+        if level["errors"] > before.get("errors", 0):
+            problems.append(f"c={level['concurrency']}: errors {before.get('errors', 0)} -> {level['errors']}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the recommender and forecasts at rising concurrency.")
+    parser.add_argument("--url", help="api_server.py base URL; default calls the Python entry points in-process")
+    parser.add_argument("--server-pid", type=int, help="Sample CPU/RSS of this process instead of the load tester")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights, e.g. search=8,facets=1,forecast=1")
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="Comma-separated concurrency steps")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds at the start of each level")
+    parser.add_argument("--forecast-keys", type=int, default=20, help="Distinct (place, week) forecasts to draw from")
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    parser.add_argument("--trends", default=TRENDS_FILE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test_report.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Earlier report; exit non-zero if capacity regressed against it")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression vs the baseline")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.levels.split(",")]
+    recommender = TourismRecommender(args.catalog)
+    workload = Workload(recommender, trend_places(args.trends), parse_mix(args.mix), args.seed, args.forecast_keys,
+                        first_week=last_observed_week(args.trends) + timedelta(weeks=1))
+    if args.url:
+        target = HttpTarget(args.url)
+    else:
+        target = InProcessTarget(recommender, args.trends, threads=max(levels))
+    sampler = ResourceSampler(args.server_pid)
+
+    log(f"🚀 Load test ({target.name}), mix {args.mix}, levels {levels}, {args.duration:g}s each")
+    report = asyncio.run(run_load_test(target, workload, levels, args.duration, args.warmup, sampler))
+    report["mix"] = parse_mix(args.mix)
+    report["created"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    log(f"✅ Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            problems = compare(report, json.load(file), args.tolerance)
+        if problems:
+            for problem in problems:
+                log(f"❌ Regression {problem}")
+            return 1
+        log("✅ No capacity regression against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
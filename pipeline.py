@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from batch_formatter import write_catalog
+from dedupe import DedupeIndex
+from fast_fetch import FastFetcher
+from package_extractor import extract_fields
+from scraping_engine import ScraperPool, read_urls
+from tourism_recommendation import TourismRecommender
+
+# Marks the end of the stream; each stage passes it on once all of its workers have stopped.
+_DONE = object()
+
+
+def validate_package(record):
+    """Problems that keep an extracted record out of the catalog (empty list when it is usable)."""
+    problems = []
+    if not record.get("name"):
+        problems.append("missing name")
+    if not record.get("location"):
+        problems.append("missing location")
+    price = record.get("price")
+    if not isinstance(price, (int, float)) or price <= 0:
+        problems.append("missing or invalid price")
+    duration = record.get("duration")
+    if duration is not None and (not isinstance(duration, int) or duration <= 0):
+        problems.append("invalid duration")
+    return problems
+
+
+class StageMetrics:
+    def __init__(self, name):
+        self.name = name
+        self.received = 0
+        self.emitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.max_queue = 0
+        self.started = time.perf_counter()
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        per_item = self.busy / self.received if self.received else 0.0
+        return (f"{self.name:<9} in={self.received:<6} out={self.emitted:<6} dropped={self.dropped:<5} "
+                f"failed={self.failed:<5} {self.emitted / elapsed:7.1f}/s  {per_item * 1000:7.1f} ms/item  "
+                f"max queue={self.max_queue}")
+
+
+class Stage:
+    def __init__(self, name, handler, workers=1, queue_size=100):
+        """One pipeline step: `workers` coroutines applying `handler` to items from a bounded queue.
+
+        The handler is an async function returning a list of items for the next stage
+        (empty to drop the item). A full downstream queue blocks the workers, so a slow
+        stage throttles everything in front of it.
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.inbox = asyncio.Queue(maxsize=queue_size)
+        self.metrics = StageMetrics(name)
+        self.next = None
+
+    async def put(self, item):
+        await self.inbox.put(item)
+        self.metrics.max_queue = max(self.metrics.max_queue, self.inbox.qsize())
+
+    async def run(self):
+        self.metrics.started = time.perf_counter()
+        await asyncio.gather(*(self._work() for _ in range(self.workers)))
+        if self.next is not None:
+            await self.next.put(_DONE)
+
+    async def _work(self):
+        while True:
+            item = await self.inbox.get()
+            if item is _DONE:
+                # Hand the marker on to this stage's other workers.
+                await self.inbox.put(_DONE)
+                return
+            self.metrics.received += 1
+            start = time.perf_counter()
+            try:
+                outputs = await self.handler(item)
+            except Exception as e:
+                self.metrics.failed += 1
+                print(f"❌ {self.name} failed: {e!r}", file=sys.stderr)
+                continue
+            finally:
+                self.metrics.busy += time.perf_counter() - start
+            if not outputs:
+                self.metrics.dropped += 1
+                continue
+            for output in outputs:
+                self.metrics.emitted += 1
+                if self.next is not None:
+                    await self.next.put(output)
+
+
+class PackagePipeline:
+    def __init__(self, recommender, catalog_json=None, fetch_workers=8, browser_workers=1, extract_workers=2,
+                 queue_size=50, flush_interval=30, report_interval=10, use_browser=True, **fetcher_options):
+        """Stream pages from fetch to a live TourismRecommender: fetch → extract → validate → dedupe → index.
+
+        New packages are searchable in `recommender` as soon as they reach the index stage,
+        and are written to `catalog_json` every `flush_interval` seconds.
+        """
+        self.recommender = recommender
+        self.catalog_json = catalog_json
+        self.flush_interval = flush_interval
+        self.report_interval = report_interval
+        self.use_browser = use_browser
+        self.browser_workers = browser_workers
+        self.fetcher = FastFetcher(concurrency=fetch_workers, **fetcher_options)
+        self.extract_workers = extract_workers
+
+        # Positions in the dedupe index line up with the records the recommender was loaded from.
+        self.records = []
+        if catalog_json:
+            with open(catalog_json, "r", encoding="utf-8") as file:
+                self.records = json.load(file)["tour_packages"]
+        self.dedupe = DedupeIndex()
+        for record in self.records:
+            self.dedupe.add(record)
+        self.packages = dict(enumerate(recommender.tour_packages[:len(self.records)]))
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+        self.stages = [
+            Stage("fetch", self._fetch, fetch_workers, queue_size),
+            Stage("extract", self._extract, extract_workers, queue_size),
+            Stage("validate", self._validate, 1, queue_size),
+            # One worker: the dedupe index and the recommender are only touched from here on.
+            Stage("dedupe", self._dedupe, 1, queue_size),
+            Stage("index", self._index, 1, queue_size)
+        ]
+        for stage, following in zip(self.stages, self.stages[1:]):
+            stage.next = following
+
+    def run(self, urls):
+        return asyncio.run(self.run_async(urls))
+
+    async def run_async(self, urls):
+        loop = asyncio.get_running_loop()
+        self._session = self.fetcher.open_session()
+        self._browser = ScraperPool(workers=self.browser_workers) if self.use_browser else None
+        self._browser_threads = ThreadPoolExecutor(max_workers=self.browser_workers, thread_name_prefix="browser")
+        self._extractors = ProcessPoolExecutor(max_workers=self.extract_workers)
+        self._loop = loop
+        reporter = asyncio.ensure_future(self._report_periodically())
+        try:
+            async with self._session:
+                runners = [asyncio.ensure_future(stage.run()) for stage in self.stages]
+                for url in urls:
+                    await self.stages[0].put(url)
+                await self.stages[0].put(_DONE)
+                await asyncio.gather(*runners)
+        finally:
+            reporter.cancel()
+            self._extractors.shutdown()
+            self._browser_threads.shutdown()
+            if self._browser is not None:
+                self._browser.close()
+        self.flush()
+        self.report()
+        return [stage.metrics for stage in self.stages]
+
+    async def _fetch(self, url):
+        result, needs_browser = await self.fetcher.fetch(self._session, url)
+        if needs_browser and self._browser is not None:
+            result = await self._loop.run_in_executor(self._browser_threads, self._browser.scrape_url, url)
+        if not result.ok():
+            print(f"❌ {url}: {result.error}", file=sys.stderr)
+            return []
+        return [result]
+
+    async def _extract(self, result):
+        record = await self._loop.run_in_executor(self._extractors, extract_fields, result.text)
+        record.setdefault("package_link", result.url)
+        return [record]
+
+    async def _validate(self, record):
+        problems = validate_package(record)
+        if problems:
+            print(f"⚠️ Skipping {record.get('package_link')}: {', '.join(problems)}", file=sys.stderr)
+            return []
+        return [record]
+
+    async def _dedupe(self, record):
+        """Keep the record only if it is the best copy of its tour; report what it supersedes."""
+        pos, matches = self.dedupe.add(record)
+        published = [other for other in self.dedupe.members(pos) if other in self.packages]
+        if matches and self.dedupe.canonical(published + [pos]) != pos:
+            return []
+        return [(pos, record, published)]
+
+    async def _index(self, item):
+        pos, record, superseded = item
+        replaced = [self.packages.pop(other) for other in superseded]
+        self.packages[pos] = self.recommender.add_packages([record], replace=replaced)[0]
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return [pos]
+
+    def flush(self):
+        """Write the live catalog (one record per tour) if anything changed since the last write."""
+        self._last_flush = time.monotonic()
+        if not self._dirty or not self.catalog_json:
+            return
+        write_catalog([self.dedupe.records[pos] for pos in sorted(self.packages)], self.catalog_json)
+        self._dirty = False
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.report()
+
+    def report(self):
+        for stage in self.stages:
+            print(f"📊 {stage.metrics.summary()}  queued={stage.inbox.qsize()}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape, extract, dedupe and index packages in one streaming run.")
+    parser.add_argument("urls", nargs="*", help="Package page URLs")
+    parser.add_argument("--file", help="Text file with one URL per line")
+    parser.add_argument("--catalog", default="tour_packages.json", help="Catalog to extend")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="Concurrent page fetches")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent requests per host")
+    parser.add_argument("--min-interval", type=float, default=0.25, help="Seconds between requests to one host")
+    parser.add_argument("--browser-workers", type=int, default=1, help="Browser sessions for JavaScript pages")
+    parser.add_argument("--extract-workers", type=int, default=2, help="Extraction processes")
+    parser.add_argument("--queue-size", type=int, default=50, help="Items buffered between stages")
+    parser.add_argument("--flush-interval", type=float, default=30, help="Seconds between catalog writes")
+    parser.add_argument("--no-browser", action="store_true", help="Never fall back to Selenium")
+    args = parser.parse_args(argv)
+
+    urls = read_urls(args.urls, args.file)
+    if not urls:
+        parser.error("no URLs given")
+    pipeline = PackagePipeline(TourismRecommender(args.catalog), args.catalog, fetch_workers=args.fetch_workers,
+                               browser_workers=args.browser_workers, extract_workers=args.extract_workers,
+                               queue_size=args.queue_size, flush_interval=args.flush_interval,
+                               use_browser=not args.no_browser, per_host=args.per_host,
+                               min_interval=args.min_interval)
+    metrics = pipeline.run(urls)
+    return 1 if any(m.failed for m in metrics) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import numpy as np
+
+DEFAULT_PATHS = 2000
+# Upper bound on paths * horizon * places drawn in one call, to keep time and memory bounded.
+MAX_DRAWS = 20_000_000
+
+
+def simulate_paths(point_forecasts, residuals, n_paths=DEFAULT_PATHS, seed=None, max_draws=MAX_DRAWS):
+    """Bootstrap future sample paths around point forecasts from fitted-model residuals.
+
+    point_forecasts is (horizon,) or (places, horizon); residuals is one array or one per place.
+    Resampled one-step errors are accumulated over the horizon, so the spread widens with
+    the forecast step as it does for the differenced HW/ARIMA models used here.
+    Returns an array of shape (places, paths, horizon).
+    """
+    forecasts = np.atleast_2d(np.asarray(point_forecasts, dtype=float))
+    places, horizon = forecasts.shape
+    if isinstance(residuals, np.ndarray) and residuals.ndim == 1:
+        residuals = [residuals]
+    if len(residuals) != places:
+        raise ValueError(f"Expected residuals for {places} places, got {len(residuals)}.")
+
+    n_paths = max(1, min(n_paths, max_draws // max(1, places * horizon)))
+
+    # Pad the ragged residual series into one matrix so every place is sampled in a single draw.
+    cleaned = [_centered(r) for r in residuals]
+    lengths = np.array([len(r) for r in cleaned])
+    padded = np.zeros((places, max(1, lengths.max())))
+    for i, r in enumerate(cleaned):
+        padded[i, :len(r)] = r
+
+    rng = np.random.default_rng(seed)
+    picks = (rng.random((places, n_paths, horizon)) * np.maximum(lengths, 1)[:, None, None]).astype(np.intp)
+    shocks = padded[np.arange(places)[:, None, None], picks]
+    return forecasts[:, None, :] + np.cumsum(shocks, axis=2)
+
+
+def quantile_bands(paths, coverage=0.8):
+    """Lower/upper quantiles over the path axis for a central interval of the given coverage."""
+    tail = (1 - coverage) / 2
+    lower, upper = np.quantile(paths, [tail, 1 - tail], axis=-2)
+    return lower, upper
+
+
+def prediction_interval(point_forecasts, residuals, coverage=0.8, n_paths=DEFAULT_PATHS, seed=None):
+    """Convenience wrapper returning (lower, upper) with the same shape as point_forecasts."""
+    paths = simulate_paths(point_forecasts, residuals, n_paths=n_paths, seed=seed)
+    lower, upper = quantile_bands(paths, coverage)
+    if np.ndim(point_forecasts) == 1:
+        return lower[0], upper[0]
+    return lower, upper
+
+
+def _centered(residuals):
+    values = np.asarray(residuals, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.zeros(1)
+    return values - values.mean()
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-import plotly.express as px
+from chart_data import line_figure
+import hashlib
+import json
+import os
+import tempfile
 from datetime import datetime, timedelta
 
 # Top Tourist Destinations with Seasonal Recommendations
@@ -35,6 +38,9 @@ TRENDS_DATA = {
     'Tourism_Interest': [30, 45, 65, 80, 90]
 }
 
+# Fitted Prophet models and their forecasts, keyed by input-data fingerprint
+PROPHET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prophet_cache")
+
 def get_seasonal_recommendations(current_month=None):
     """Determine seasonal recommendations based on current month"""
     if current_month is None:
@@ -56,20 +62,70 @@ def get_seasonal_recommendations(current_month=None):
     
     return DESTINATIONS.get(current_season + ' (Dec-Feb)' if current_season == 'Winter' else current_season + ' (Mar-May)' if current_season == 'Summer' else current_season + ' (Jun-Sep)' if current_season == 'Monsoon' else current_season + ' (Oct-Nov)', [])
 
-def predict_tourism_trends():
-    """Predict tourism trends using Prophet"""
-    df = pd.DataFrame(TRENDS_DATA)
+def data_fingerprint(data, **params):
+    """Stable hash of the trends data and forecast settings"""
+    payload = json.dumps({'data': data, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def save_cache_entry(path, write):
+    """Save a cache file through write(tmp_path), so a crash or a concurrent writer never leaves a half-written entry"""
+    os.makedirs(PROPHET_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PROPHET_CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+@st.cache_resource(show_spinner="Fitting tourism trend model...")
+def load_prophet_model(fingerprint, _data):
+    """Load the saved Prophet model for this fingerprint, fitting and saving it on a miss"""
+    # Prophet is slow to import, so only pull it in when a model is needed
+    from prophet import Prophet
+    from prophet.serialize import model_from_json, model_to_json
+
+    model_path = os.path.join(PROPHET_CACHE_DIR, f"{fingerprint}_model.json")
+    if os.path.exists(model_path):
+        with open(model_path, 'r', encoding='utf-8') as file:
+            return model_from_json(file.read())
+
+    df = pd.DataFrame(_data)
     df['ds'] = pd.to_datetime(df['Year'].astype(str) + '-07-01')
     df['y'] = df['Tourism_Interest']
     
     model = Prophet(yearly_seasonality=True)
     model.fit(df)
-    
-    future = model.make_future_dataframe(periods=5, freq='Y')
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(model_to_json(model))
+    save_cache_entry(model_path, write)
+    return model
+
+@st.cache_resource(show_spinner="Forecasting tourism trends...")
+def load_prophet_forecast(fingerprint, model_fingerprint, _data, periods):
+    """Load the saved Prophet forecast for this fingerprint; on a miss, forecast from the (cached) model and save it"""
+    forecast_path = os.path.join(PROPHET_CACHE_DIR, f"{fingerprint}_forecast.pkl")
+    if os.path.exists(forecast_path):
+        return pd.read_pickle(forecast_path)
+
+    model = load_prophet_model(model_fingerprint, _data)
+    future = model.make_future_dataframe(periods=periods, freq='Y')
     forecast = model.predict(future)
-    
+    save_cache_entry(forecast_path, forecast.to_pickle)
     return forecast
 
+def predict_tourism_trends(data=TRENDS_DATA, periods=5):
+    """Predict tourism trends using Prophet"""
+    # The model depends only on the data and fit settings; the forecast also on how far ahead it runs
+    model_fingerprint = data_fingerprint(data, yearly_seasonality=True)
+    fingerprint = data_fingerprint(data, periods=periods, yearly_seasonality=True)
+    return load_prophet_forecast(fingerprint, model_fingerprint, data, periods)
+
 def main():
     st.title("Tourism Prediction & Recommendations")
     
@@ -93,11 +149,11 @@ def main():
         st.write(f"🌍 **{dest['name']}**: {dest['reason']}")
     
     # Visualization of trends
-    fig = px.line(
+    fig = line_figure(
         forecast, 
-        x='ds', 
-        y=['yhat', 'yhat_lower', 'yhat_upper'],
-        title='Tourism Interest Trend'
+        'ds', 
+        ['yhat', 'yhat_lower', 'yhat_upper'],
+        'Tourism Interest Trend'
     )
     st.plotly_chart(fig)
     
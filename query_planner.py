@@ -0,0 +1,179 @@
+from collections import Counter
+
+from range_index import is_number
+
+# Relative cost of one evaluation of each kind of check
+COSTS = {"compare": 1.0, "equals": 1.0, "contains": 2.0, "any_of": 3.0}
+VALUE_FIELDS = ("accommodation_type", "meal_plan", "transport_type", "difficulty_level")
+
+
+def _text(value):
+    return value if isinstance(value, str) else ""
+
+
+class CatalogStats:
+    def __init__(self, packages, range_indexes):
+        """Value distributions used to estimate how many packages each filter lets through."""
+        self.total = len(packages)
+        self.ranges = range_indexes  # {field: RangeIndex}, shared with the recommender
+        self.values = {field: Counter(getattr(pkg, field) for pkg in packages) for field in VALUE_FIELDS}
+        self.activities = Counter(act for pkg in packages for act in set(pkg.activities or []))
+        self.languages = Counter(lang for pkg in packages for lang in set(pkg.language_support or []))
+        self.no_languages = sum(1 for pkg in packages if not pkg.language_support)
+
+    @property
+    def size(self):
+        return max(self.total, 1)
+
+    def add(self, pkg, count=1):
+        """Count one more package (or one fewer with count=-1); the range indexes are updated by their owner."""
+        self.total += count
+        for field in VALUE_FIELDS:
+            self.values[field][getattr(pkg, field)] += count
+        for act in set(pkg.activities or []):
+            self.activities[act] += count
+        for lang in set(pkg.language_support or []):
+            self.languages[lang] += count
+        if not pkg.language_support:
+            self.no_languages += count
+
+    def remove(self, pkg):
+        self.add(pkg, count=-1)
+
+    def fraction(self, count):
+        return min(max(count / self.size, 0.0), 1.0)
+
+    def unknown(self, field):
+        return self.size - len(self.ranges[field])
+
+    def containing(self, field, text):
+        return sum(count for value, count in self.values[field].items() if text in _text(value))
+
+    def any_of(self, counter, wanted, total):
+        """Share of `total` packages having at least one wanted value, assuming independent values."""
+        missing = 1.0
+        for value in set(wanted):
+            missing *= 1.0 - min(counter.get(value, 0) / max(total, 1), 1.0)
+        return 1.0 - missing
+
+
+class Predicate:
+    def __init__(self, name, test, selectivity, kind):
+        """One compiled filter: `test(pkg)` plus the estimated share of packages that pass it."""
+        self.name = name
+        self.test = test
+        self.selectivity = selectivity
+        self.cost = COSTS[kind]
+
+    @property
+    def rank(self):
+        # Cheap checks that reject a lot go first (cost per package rejected)
+        return self.cost / max(1.0 - self.selectivity, 1e-9)
+
+
+class QueryPlan:
+    def __init__(self, predicates):
+        self.predicates = sorted(predicates, key=lambda p: p.rank)
+
+    def filter(self, packages, explain=None):
+        """Packages passing every predicate, in their original order; appends one row per stage to `explain`."""
+        candidates = list(packages)
+        for predicate in self.predicates:
+            before = len(candidates)
+            if candidates:
+                candidates = [pkg for pkg in candidates if predicate.test(pkg)]
+            if explain is not None:
+                explain.append(explain_row(predicate.name, before, len(candidates), predicate.selectivity))
+        return candidates
+
+
+def explain_row(stage, before, after, estimate=None):
+    return {"stage": stage, "candidates": before, "kept": after, "pruned": before - after,
+            "estimated_pass": None if estimate is None else round(estimate, 3)}
+
+
+def compile_preferences(preferences, stats):
+    """QueryPlan for the attribute filters that are actually set in `preferences`.
+
+    Same rules as the original filter chain: "Any" or empty values are ignored; a package without
+    a rating, group size or language list is not excluded by those filters; a package without a
+    price or duration never satisfies a limit on it.
+    """
+    predicates = []
+
+    def enabled(name):
+        value = preferences.get(name)
+        return value if value and value != "Any" else None
+
+    max_price = enabled("max_price")
+    if max_price:
+        predicates.append(Predicate(
+            "max_price", lambda pkg: is_number(pkg.price) and pkg.price <= max_price,
+            stats.fraction(stats.ranges["price"].count(None, max_price)), "compare"))
+
+    min_duration = enabled("preferred_duration")
+    if min_duration:
+        predicates.append(Predicate(
+            "preferred_duration", lambda pkg: is_number(pkg.duration) and pkg.duration >= min_duration,
+            stats.fraction(stats.ranges["duration"].count(min_duration, None)), "compare"))
+
+    activities = enabled("preferred_activities")
+    if activities:
+        wanted = list(activities)
+        predicates.append(Predicate(
+            "preferred_activities", lambda pkg: any(act in (pkg.activities or []) for act in wanted),
+            stats.any_of(stats.activities, wanted, stats.size), "any_of"))
+
+    accommodation = enabled("accommodation_type")
+    if accommodation:
+        predicates.append(Predicate(
+            "accommodation_type", lambda pkg: accommodation in _text(pkg.accommodation_type),
+            stats.fraction(stats.containing("accommodation_type", accommodation)), "contains"))
+
+    meal_plan = enabled("meal_plan")
+    if meal_plan:
+        predicates.append(Predicate(
+            "meal_plan", lambda pkg: pkg.meal_plan == meal_plan,
+            stats.fraction(stats.values["meal_plan"].get(meal_plan, 0)), "equals"))
+
+    transport = enabled("transport_type")
+    if transport:
+        predicates.append(Predicate(
+            "transport_type", lambda pkg: transport in _text(pkg.transport_type),
+            stats.fraction(stats.containing("transport_type", transport)), "contains"))
+
+    difficulty = enabled("difficulty_level")
+    if difficulty:
+        predicates.append(Predicate(
+            "difficulty_level", lambda pkg: pkg.difficulty_level == difficulty,
+            stats.fraction(stats.values["difficulty_level"].get(difficulty, 0)), "equals"))
+
+    languages = enabled("required_languages")
+    if languages:
+        wanted_languages = list(languages)
+        with_languages = stats.size - stats.no_languages
+        estimate = stats.fraction(stats.no_languages
+                                  + stats.any_of(stats.languages, wanted_languages, with_languages) * with_languages)
+        predicates.append(Predicate(
+            "required_languages",
+            lambda pkg: not pkg.language_support or any(lang in pkg.language_support for lang in wanted_languages),
+            estimate, "any_of"))
+
+    max_group = enabled("max_group_size")
+    if max_group:
+        index = stats.ranges["max_group_size"]
+        estimate = stats.fraction(index.count(None, max_group) + stats.unknown("max_group_size"))
+        predicates.append(Predicate(
+            "max_group_size",
+            lambda pkg: not is_number(pkg.max_group_size) or pkg.max_group_size == 0 or pkg.max_group_size <= max_group,
+            estimate, "compare"))
+
+    min_rating = enabled("min_rating")
+    if min_rating:
+        index = stats.ranges["rating"]
+        estimate = stats.fraction(index.count(min_rating, None) + index.count(0, 0) + stats.unknown("rating"))
+        predicates.append(Predicate(
+            "min_rating", lambda pkg: not is_number(pkg.rating) or pkg.rating == 0 or pkg.rating >= min_rating,
+            estimate, "compare"))
+
+    return QueryPlan(predicates)
@@ -0,0 +1,54 @@
+from bisect import bisect_left, bisect_right
+
+
+class RangeIndex:
+    def __init__(self, values):
+        """Sorted (value, position) pairs for one numeric field; unknown values are left out."""
+        pairs = sorted((value, pos) for pos, value in enumerate(values) if is_number(value))
+        self.keys = [value for value, _ in pairs]
+        self.positions = [pos for _, pos in pairs]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, pos, value):
+        if is_number(value):
+            i = bisect_right(self.keys, value)
+            self.keys.insert(i, value)
+            self.positions.insert(i, pos)
+
+    def remove(self, pos, value):
+        if not is_number(value):
+            return
+        start, end = bisect_left(self.keys, value), bisect_right(self.keys, value)
+        i = self.positions.index(pos, start, end)
+        del self.keys[i]
+        del self.positions[i]
+
+    def query(self, low=None, high=None):
+        """Positions whose value lies in [low, high]; either bound may be None for open-ended."""
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return self.positions[start:end]
+
+    def count(self, low=None, high=None):
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return max(0, end - start)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+
+
+def intersect_ranges(indexes, bounds):
+    """Sorted positions matching every (low, high) in `bounds` ({field: (low, high)})."""
+    # Start from the narrowest range so the intersection stays small.
+    ordered = sorted(bounds.items(), key=lambda item: indexes[item[0]].count(*item[1]))
+    matched = None
+    for field, (low, high) in ordered:
+        positions = indexes[field].query(low, high)
+        matched = set(positions) if matched is None else matched.intersection(positions)
+        if not matched:
+            return []
+    return sorted(matched) if matched is not None else []
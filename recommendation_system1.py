@@ -1,19 +1,39 @@
+import os
+from datetime import date, timedelta
+
 import streamlit as st
+from crowd_levels import CROWD_LABELS
 from tourism_recommendation import TourismRecommender
 
+CATALOG_FILE = "tour_packages.json"
+
+@st.cache_resource(show_spinner="Loading tour packages...", max_entries=1)
+def load_recommender(json_file, modified):
+    # Shared by every session and rerun, so the lazily built indexes survive between interactions.
+    # `modified` (the file's mtime) makes an updated catalog load as a fresh recommender.
+    return TourismRecommender(json_file)
+
 def run():
     st.title("🌍 Tourism Package Recommender")
     st.write("Find your perfect vacation package!")
 
     try:
-        recommender = TourismRecommender("tour_packages.json")
+        recommender = load_recommender(CATALOG_FILE, os.path.getmtime(CATALOG_FILE))
         location_query = st.text_input("🔍 Search for a location (e.g., Munnar, Kerala)", "").strip()
+        near_km = st.slider("📍 Also include packages within (km)", 0, 300, 0, 25)
 
         st.sidebar.header("🛠️ Filters")
-        st.sidebar.subheader("💰 Price Limit")
-        max_price = st.sidebar.number_input("Enter Maximum Price (₹)", min_value=5000, max_value=50000, value=20000, step=1000)
+        st.sidebar.subheader("💰 Price Range")
+        price_range = st.sidebar.slider("Price (₹)", 0, 50000, (0, 20000), step=1000)
         preferred_duration = st.sidebar.slider("🕒 Preferred Duration (days)", 2, 15, 7)
 
+        travel_window = None
+        if st.sidebar.checkbox("📆 Filter by travel dates"):
+            today = date.today()
+            window = st.sidebar.date_input("Travel Window", (today, today + timedelta(days=30)))
+            if isinstance(window, (tuple, list)) and len(window) == 2:
+                travel_window = tuple(window)
+
         unique_activities = recommender.get_unique_values()["activities"]
         preferred_activities = st.sidebar.multiselect("🎯 Preferred Activities", unique_activities)
 
@@ -35,9 +55,14 @@ def run():
 
             max_group_size = st.number_input("👥 Maximum Group Size", 1, 100, 20)
             min_rating = st.slider("⭐ Minimum Rating", 1.0, 5.0, 4.0, 0.1)
+            duration_range = st.slider("📅 Duration Window (days)", 1, 30, (1, 30))
+            collapse_duplicates = st.checkbox("🔁 Hide near-duplicate listings", value=True)
+            crowd_label = st.selectbox("👥 Maximum Crowd Level", ["Any"] + list(CROWD_LABELS))
+            sort_by_crowd = st.checkbox("📉 Least crowded first")
 
         preferences = {
-            "max_price": max_price,
+            "price_range": price_range,
+            "duration_range": duration_range if duration_range != (1, 30) else None,
             "preferred_activities": preferred_activities,
             "accommodation_type": accommodation_type if accommodation_type != "Any" else None,
             "preferred_duration": preferred_duration,
@@ -46,11 +71,20 @@ def run():
             "difficulty_level": difficulty_level if difficulty_level != "Any" else None,
             "required_languages": required_languages,
             "max_group_size": max_group_size,
-            "min_rating": min_rating
+            "min_rating": min_rating,
+            "collapse_duplicates": collapse_duplicates,
+            "travel_window": travel_window,
+            "near_km": near_km,
+            "max_crowd_level": CROWD_LABELS.get(crowd_label),
+            "sort_by_crowd": sort_by_crowd
         }
 
         if location_query:
-            results = recommender.search_packages(location_query, preferences)
+            explain = []
+            results = recommender.search_packages(location_query, preferences, explain=explain)
+            with st.expander("🧮 Query plan"):
+                st.caption("Candidates left after each filtering stage, most selective filters first.")
+                st.table(explain)
             if not results:
                 st.warning("⚠️ No results found. Try adjusting your filters.")
             else:
@@ -65,6 +99,9 @@ def run():
                         st.write(f"**🚗 Transport:** {package.transport_type}")
                         st.write(f"**🔧 Difficulty:** {package.difficulty_level}")
                         st.write(f"**👥 Max Group Size:** {package.max_group_size}")
+                        crowd = recommender.crowd_level(package, travel_window[0] if travel_window else None)
+                        if crowd is not None:
+                            st.write(f"**🚶 Expected Crowd:** {crowd}% of a usual week")
                         st.write(f"**🏷️ Seller:** {package.seller}")
                         st.write(f"**📍 Seller Address:** {package.seller_address}")
                         if package.package_link:
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.firefox.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+
+# "More+" links that expand collapsed package details on Yatra-style pages
+MORE_BUTTON_SELECTOR = ".readMore"
+
+
+def make_firefox_driver(headless=True):
+    """Start Firefox; set GECKODRIVER_PATH to use a specific geckodriver binary."""
+    options = Options()
+    if headless:
+        options.add_argument("-headless")
+    driver_path = os.environ.get("GECKODRIVER_PATH")
+    # Without an explicit path Selenium Manager locates (or downloads) geckodriver.
+    service = Service(driver_path) if driver_path else Service()
+    return webdriver.Firefox(service=service, options=options)
+
+
+class BrowserPool:
+    def __init__(self, size, driver_factory=make_firefox_driver):
+        """Up to `size` browser sessions, started lazily and reused across pages."""
+        self.size = size
+        self.driver_factory = driver_factory
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self.driver_factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    def release(self, driver, broken=False):
+        """Return a session to the pool, or discard it if it is no longer usable."""
+        if not broken:
+            self._idle.put(driver)
+            return
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+class ScrapeResult:
+    def __init__(self, url, text=None, error=None, attempts=0, elapsed=0.0, source="browser"):
+        self.url = url
+        self.source = source
+        self.text = text
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "text": self.text,
+            "error": self.error,
+            "source": self.source,
+            "attempts": self.attempts,
+            "elapsed": round(self.elapsed, 3)
+        }
+
+
+class ScraperPool:
+    def __init__(self, workers=3, retries=2, page_timeout=20, expand_timeout=2,
+                 driver_factory=make_firefox_driver, more_selector=MORE_BUTTON_SELECTOR, retry_delay=0.5):
+        """Scrape many package pages with a bounded pool of reusable browser sessions."""
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.page_timeout = page_timeout
+        self.expand_timeout = expand_timeout
+        self.more_selector = more_selector
+        self.browsers = BrowserPool(workers, driver_factory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.browsers.close()
+
+    def scrape(self, urls):
+        """Yield a ScrapeResult for each URL as soon as that page finishes."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scraper") as executor:
+            futures = [executor.submit(self.scrape_url, url) for url in urls]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def scrape_url(self, url):
+        start = time.perf_counter()
+        error = None
+        for attempt in range(1, self.retries + 2):
+            try:
+                driver = self.browsers.acquire()
+            except Exception as e:
+                driver, error = None, f"Could not start browser: {e}"
+            if driver is not None:
+                broken = False
+                try:
+                    text = self.scrape_page(driver, url)
+                    return ScrapeResult(url, text=text, attempts=attempt, elapsed=time.perf_counter() - start)
+                except TimeoutException as e:
+                    # The session is still healthy; the page was just slow.
+                    error = f"Timed out: {e.msg or 'page did not finish loading'}"
+                except WebDriverException as e:
+                    broken = True
+                    error = f"Browser error: {e.msg or e}"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                finally:
+                    # Always hand the session back, or later acquire() calls wait for it forever.
+                    self.browsers.release(driver, broken=broken)
+            if attempt <= self.retries:
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+        print(f"❌ Failed to scrape {url}: {error}")
+        return ScrapeResult(url, error=error, attempts=self.retries + 1, elapsed=time.perf_counter() - start)
+
+    def scrape_page(self, driver, url):
+        driver.get(url)
+        wait = WebDriverWait(driver, self.page_timeout)
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        self._expand_sections(driver)
+        return driver.find_element(By.TAG_NAME, "body").text
+
+    def _expand_sections(self, driver):
+        """Click every "More+" button, waiting for the page to change rather than sleeping."""
+        for button in driver.find_elements(By.CSS_SELECTOR, self.more_selector):
+            try:
+                before = driver.execute_script("return document.body.innerHTML.length")
+                driver.execute_script("arguments[0].scrollIntoView();", button)
+                driver.execute_script("arguments[0].click();", button)
+                WebDriverWait(driver, self.expand_timeout).until(
+                    lambda d: d.execute_script("return document.body.innerHTML.length") != before
+                )
+            except (TimeoutException, StaleElementReferenceException):
+                # Nothing new was loaded for this button; carry on with the rest.
+                continue
+
+
+def output_filename(url):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", url.split("://", 1)[-1]).strip("-")
+    return f"{slug[:120]}.txt"
+
+
+def read_urls(urls=(), url_file=None):
+    all_urls = list(urls)
+    if url_file:
+        with open(url_file, "r", encoding="utf-8") as file:
+            all_urls.extend(line.strip() for line in file if line.strip() and not line.startswith("#"))
+    return all_urls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape tour package pages with a pool of headless browsers.")
+    parser.add_argument("urls", nargs="*", help="Package page URLs")
+    parser.add_argument("--file", help="Text file with one URL per line")
+    parser.add_argument("--workers", type=int, default=3, help="Concurrent browser sessions")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per page after a failure")
+    parser.add_argument("--timeout", type=float, default=20, help="Seconds to wait for a page to load")
+    parser.add_argument("--output-dir", help="Write each page's text to its own file here "
+                                             "(default: stream JSON lines to stdout)")
+    args = parser.parse_args(argv)
+
+    urls = read_urls(args.urls, args.file)
+    if not urls:
+        parser.error("no URLs given")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failures = 0
+    with ScraperPool(workers=args.workers, retries=args.retries, page_timeout=args.timeout) as pool:
+        for result in pool.scrape(urls):
+            if not result.ok():
+                failures += 1
+            if args.output_dir and result.ok():
+                path = os.path.join(args.output_dir, output_filename(result.url))
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(result.text)
+                print(f"✅ {result.url} -> {path} ({result.elapsed:.1f}s)", file=sys.stderr)
+            elif not args.output_dir:
+                print(json.dumps(result.to_dict(), ensure_ascii=False), flush=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
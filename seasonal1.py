@@ -2,8 +2,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import plotly.express as px
+from functools import lru_cache
 import plotly.graph_objects as go
+from chart_data import line_figure
 
 DESTINATIONS = {
     'Winter (Dec-Feb)': [
@@ -36,15 +37,28 @@ DESTINATIONS = {
     ]
 }
 
-# Load the uploaded file to get the tourism data
-file_path = 'tourism_data.csv'
-tourism_data = pd.read_csv(file_path)
+TOURISM_DATA_FILE = 'tourism_data.csv'
 
-# Convert the 'Week' column to datetime
-tourism_data['Week'] = pd.to_datetime(tourism_data['Week'], format='%d-%m-%Y')
+@lru_cache(maxsize=None)
+def load_tourism_data(file_path=TOURISM_DATA_FILE):
+    # Read lazily, once per process, instead of at import time
+    tourism_data = pd.read_csv(file_path)
 
-# Extract month from the 'Week' column
-tourism_data['Month'] = tourism_data['Week'].dt.month
+    # Convert the 'Week' column to datetime
+    tourism_data['Week'] = pd.to_datetime(tourism_data['Week'], format='%d-%m-%Y')
+
+    # Extract month from the 'Week' column
+    tourism_data['Month'] = tourism_data['Week'].dt.month
+    return tourism_data
+
+@lru_cache(maxsize=None)
+def monthly_aggregates(file_path=TOURISM_DATA_FILE):
+    # One row per calendar month (1-12), so per-month lookups are O(1)
+    interest = load_tourism_data(file_path).groupby('Month')['Tourism in India']
+    table = interest.agg(['mean', 'median', 'count'])
+    table['q25'] = interest.quantile(0.25)
+    table['q75'] = interest.quantile(0.75)
+    return table.reindex(range(1, 13))
 
 def get_seasonal_recommendations(current_month=None):
     if current_month is None:
@@ -64,26 +78,35 @@ def get_seasonal_recommendations(current_month=None):
     }[current_season]
     return DESTINATIONS.get(season_key, [])
 
-def predict_next_month_tourism():
-    current_month = datetime.now().month
-    latest_month_data = tourism_data[tourism_data['Month'] == current_month]
-    next_month = (current_month % 12) + 1  # next month
-    latest_month_avg = latest_month_data['Tourism in India'].mean()
-    return latest_month_avg
+def predict_next_month_tourism(current_month=None):
+    if current_month is None:
+        current_month = datetime.now().month
+    return monthly_aggregates().at[current_month, 'mean']
 
-def plot_tourism_trends():
-    fig = px.line(tourism_data, x='Week', y='Tourism in India', title='Tourism Interest Over Time')
+def plot_tourism_trends(next_month_prediction=None, x_range=None):
+    # Downsampled to screen resolution and cached per zoom range by the chart data layer
+    fig = line_figure(load_tourism_data(), 'Week', 'Tourism in India', 'Tourism Interest Over Time',
+                      key=TOURISM_DATA_FILE, x_range=x_range)
     fig.update_layout(xaxis_title='Week', yaxis_title='Tourism Interest')
 
-    # Mark the predicted tourism interest as a red dot on the plot
-    next_month_prediction = predict_next_month_tourism()
-    prediction_date = datetime(datetime.now().year, (datetime.now().month % 12) + 1, 1)
+    # Mark the predicted tourism interest as a red dot on the plot, with the month's interquartile range
+    current_month = datetime.now().month
+    month_stats = monthly_aggregates().loc[current_month]
+    if next_month_prediction is None:
+        next_month_prediction = month_stats['mean']
+    prediction_date = datetime(datetime.now().year, (current_month % 12) + 1, 1)
     
     fig.add_trace(go.Scatter(
         x=[prediction_date],
         y=[next_month_prediction],
         mode='markers',
         marker=dict(color='red', size=12),
+        error_y=dict(
+            type='data',
+            symmetric=False,
+            array=[month_stats['q75'] - next_month_prediction],
+            arrayminus=[next_month_prediction - month_stats['q25']]
+        ),
         name='Predicted Interest'
     ))
 
@@ -105,7 +128,12 @@ def run():
 
     # Plot the tourism trends
     st.header("📊 Tourism Interest Trends")
-    fig = plot_tourism_trends()
+    weeks = load_tourism_data()['Week']
+    first_week, last_week = weeks.min().to_pydatetime(), weeks.max().to_pydatetime()
+    zoom = st.slider("Zoom to period", min_value=first_week, max_value=last_week,
+                     value=(first_week, last_week), format="MMM YYYY")
+    x_range = None if zoom == (first_week, last_week) else zoom
+    fig = plot_tourism_trends(next_month_prediction, x_range=x_range)
     st.plotly_chart(fig)
 
     st.markdown("**Recommendation:** Consider these destinations for your next month's travel plans.")
@@ -0,0 +1,302 @@
+import argparse
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+from dedupe import collapse_results
+from geo_index import get_gazetteer, normalize_place
+from range_index import is_number
+from tourism_recommendation import TourPackage, TourismRecommender
+
+# Preferences that compare packages across shards, so they are applied after merging
+MERGE_PREFERENCES = ("sort_by_crowd", "collapse_duplicates")
+# Packages within one cell of this many degrees (~220 km) land on the same shard in region mode
+REGION_DEGREES = 2.0
+
+
+def region_key(record):
+    """Coarse geographic key for a catalog record: the grid cell of the first place it names."""
+    location = record.get("location") or ""
+    places = get_gazetteer().resolve(location)
+    if places:
+        _, lat, lon = places[0]
+        return f"{math.floor(lat / REGION_DEGREES)}:{math.floor(lon / REGION_DEGREES)}"
+    text = location[-1] if isinstance(location, list) and location else str(location)
+    return normalize_place(text.split(",")[-1])
+
+
+def shard_of(record, shards, by="hash"):
+    if by == "region":
+        key = region_key(record)
+    else:
+        key = "|".join(str(record.get(field)) for field in ("package_link", "name", "seller", "location"))
+    return zlib.crc32(str(key).encode("utf-8")) % shards
+
+
+def rank_key(record, rank_by, descending):
+    """Sort key putting the best value first and packages without one last."""
+    value = record.get(rank_by)
+    if not is_number(value):
+        return (1, 0)
+    return (0, -value if descending else value)
+
+
+def _sort_key(pkg, position, rank_by, descending):
+    """Merge order of a match: by rank with catalog position as tie-break, else by position alone."""
+    if rank_by:
+        return (rank_key(vars(pkg), rank_by, descending), position)
+    return (position,)
+
+
+def _serve(conn, records, positions):
+    """Worker loop: owns one shard's recommender (and so its indexes) for the life of the process.
+
+    Requests arrive as (request_id, op, args); each reply carries its request's id.
+    """
+    recommender = TourismRecommender.from_packages(records)
+    catalog_position = {id(pkg): pos for pkg, pos in zip(recommender.tour_packages, positions)}
+    while True:
+        try:
+            request_id, op, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            if op == "search":
+                location, preferences, k, rank_by, descending = args
+                results = recommender.search_packages(location, preferences)
+                # Only sort keys travel back; the parent maps the trailing catalog position to the package.
+                matched = [_sort_key(pkg, catalog_position[id(pkg)], rank_by, descending) for pkg in results]
+                matched = heapq.nsmallest(k, matched) if k is not None else sorted(matched)
+                conn.send((request_id, "ok", matched))
+            elif op == "unique_values":
+                conn.send((request_id, "ok", recommender.get_unique_values()))
+            elif op == "stop":
+                conn.send((request_id, "ok", None))
+                return
+            else:
+                conn.send((request_id, "error", f"Unknown operation '{op}'"))
+        except Exception as e:
+            conn.send((request_id, "error", f"{type(e).__name__}: {e}"))
+
+
+class ShardWorker:
+    def __init__(self, records, positions):
+        """One shard's worker process and its pipe, shared by any number of in-flight requests.
+
+        A reader thread hands each reply to the Future of the request with the same id, so
+        concurrent queries overlap and a reply can never be taken by the wrong request.
+        """
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child, records, positions), daemon=True)
+        self.process.start()
+        child.close()
+        self.alive = True
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_replies, daemon=True)
+        self._reader.start()
+
+    def request(self, op, args=None):
+        """Future of the worker's (status, message) reply; fails with ConnectionError if the worker dies."""
+        future = Future()
+        with self._lock:
+            if not self.alive:
+                future.set_exception(ConnectionError("Shard worker has stopped"))
+                return future
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self.conn.send((request_id, op, args))
+        except (OSError, ValueError) as e:
+            self._fail_pending(e)
+        return future
+
+    def _read_replies(self):
+        while True:
+            try:
+                request_id, status, message = self.conn.recv()
+            except (EOFError, OSError) as e:
+                self._fail_pending(e)
+                return
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is not None:
+                future.set_result((status, message))
+
+    def _fail_pending(self, error):
+        with self._lock:
+            self.alive = False
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(ConnectionError(f"Shard worker stopped: {error!r}"))
+
+    def close(self, timeout=5):
+        self.conn.close()
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=timeout)
+
+
+class ShardedRecommender:
+    def __init__(self, json_file=None, packages=None, shards=None, by="hash"):
+        """Catalog split across `shards` worker processes (default: one per core), queried in parallel.
+
+        Packages are assigned by a hash of their identity, or with by="region" by coarse geography.
+        Each worker builds and keeps the indexes for its shard; this process only keeps the package
+        objects so it can hand back results. Results come back in catalog order, as from a single
+        TourismRecommender.
+        """
+        if packages is None:
+            with open(json_file, "r", encoding="utf-8") as file:
+                packages = json.load(file)["tour_packages"]
+        self.shards = shards or os.cpu_count() or 1
+        self.by = by
+        self.tour_packages = [TourPackage(record) for record in packages]
+        parts = [([], []) for _ in range(self.shards)]
+        for pos, record in enumerate(packages):
+            records, positions = parts[shard_of(record, self.shards, by)]
+            records.append(record)
+            positions.append(pos)
+        self.shard_sizes = [len(records) for records, _ in parts]
+
+        self._restart_lock = threading.Lock()
+        self._merge_helper = TourismRecommender.from_packages([])
+        self._parts = parts
+        self._workers = [ShardWorker(records, positions) for records, positions in parts]
+
+    def _restart_worker(self, shard, dead):
+        """Replace a dead worker from its partition, unless another request already has."""
+        with self._restart_lock:
+            if self._workers[shard] is not dead:
+                return
+            dead.close(timeout=0)
+            self._workers[shard] = ShardWorker(*self._parts[shard])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __len__(self):
+        return len(self.tour_packages)
+
+    def _exchange(self, workers, op, args=None):
+        """Send one request to every given worker and wait for all answers; None where a worker died."""
+        futures = [worker.request(op, args) for worker in workers]
+        replies = []
+        for future in futures:
+            try:
+                replies.append(future.result())
+            except ConnectionError:
+                replies.append(None)
+        return replies
+
+    def _fan_out(self, op, args=None):
+        """One request answered by every shard (the shards work in parallel); dead shards are restarted.
+
+        Safe to call from several threads at once; their requests overlap in the workers' pipes.
+        """
+        workers = list(self._workers)
+        replies = self._exchange(workers, op, args)
+        dead = [shard for shard, reply in enumerate(replies) if reply is None]
+        for shard in dead:
+            self._restart_worker(shard, workers[shard])
+        if dead:
+            raise RuntimeError(f"Shard {dead[0]} stopped responding and was restarted; retry the request.")
+        errors = [message for status, message in replies if status != "ok"]
+        if errors:
+            raise RuntimeError(f"Shard error: {errors[0]}")
+        return [message for _, message in replies]
+
+    def search_packages(self, location, preferences, k=None, rank_by=None, descending=False):
+        """Matching packages from every shard; with `k`, only the first k (by `rank_by` if given)."""
+        shard_preferences = {key: value for key, value in preferences.items() if key not in MERGE_PREFERENCES}
+        merge_after = any(preferences.get(key) for key in MERGE_PREFERENCES)
+        # Collapsing or crowd ordering can change which packages make the top k, so shards send everything then.
+        shard_k = None if merge_after else k
+        shard_rank = None if merge_after else rank_by
+        replies = self._fan_out("search", (location, shard_preferences, shard_k, shard_rank, descending))
+
+        merged = heapq.merge(*replies)
+        if shard_k is not None:
+            merged = (key for _, key in zip(range(k), merged))
+        results = [self.tour_packages[key[-1]] for key in merged]
+
+        if preferences.get("sort_by_crowd"):
+            results = self._merge_helper._apply_crowd(results, {**preferences, "max_crowd_level": None})
+        if preferences.get("collapse_duplicates"):
+            results = collapse_results(results)
+        if rank_by and merge_after and not preferences.get("sort_by_crowd"):
+            results.sort(key=lambda pkg: rank_key(vars(pkg), rank_by, descending))
+        return results[:k] if k is not None else results
+
+    def get_unique_values(self):
+        merged = {}
+        for values in self._fan_out("unique_values"):
+            for name, items in values.items():
+                merged.setdefault(name, set()).update(items)
+        return {name: sorted(items) for name, items in merged.items()}
+
+    def close(self):
+        if not self._workers:
+            return
+        workers, self._workers = self._workers, []
+        self._exchange(workers, "stop")
+        for worker in workers:
+            worker.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare single-process and sharded package search.")
+    parser.add_argument("--catalog", default="tour_packages.json")
+    parser.add_argument("--shards", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--by", choices=["hash", "region"], default="hash", help="How packages are assigned to shards")
+    parser.add_argument("--location", default="", help="Location to search for (default: everything)")
+    parser.add_argument("--queries", type=int, default=50, help="Queries to time")
+    parser.add_argument("--top", type=int, default=None, help="Return only the best N by rating")
+    args = parser.parse_args(argv)
+
+    preferences = {"min_rating": 4.0, "required_languages": ["English"]}
+    rank_by = "rating" if args.top else None
+
+    single = TourismRecommender(args.catalog)
+    single.search_packages(args.location, preferences)
+    started = time.perf_counter()
+    for _ in range(args.queries):
+        expected = single.search_packages(args.location, preferences)
+    single_ms = (time.perf_counter() - started) / args.queries * 1000
+    if args.top:
+        expected = sorted(expected, key=lambda pkg: rank_key(vars(pkg), rank_by, True))[:args.top]
+
+    with ShardedRecommender(args.catalog, shards=args.shards, by=args.by) as sharded:
+        sharded.search_packages(args.location, preferences, k=args.top, rank_by=rank_by, descending=True)
+        started = time.perf_counter()
+        for _ in range(args.queries):
+            results = sharded.search_packages(args.location, preferences, k=args.top, rank_by=rank_by,
+                                              descending=True)
+        sharded_ms = (time.perf_counter() - started) / args.queries * 1000
+        sizes = sharded.shard_sizes
+
+    same = [pkg.name for pkg in results] == [pkg.name for pkg in expected]
+    print(f"{'✅' if same else '❌'} {len(results)} results, {'same as' if same else 'DIFFERENT from'} single process")
+    print(f"⏱️ single process {single_ms:.1f} ms/query, {len(sizes)} shards {sharded_ms:.1f} ms/query "
+          f"(shard sizes {sizes})")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import api_server
+from tourism_recommendation import TourismRecommender
+
+PACKAGES = [
+    {"name": "Goa Beaches", "location": "Goa", "price": 12000, "rating": 4.5,
+     "available_dates": ["March to May 2025"]},
+    {"name": "Old Goa Heritage", "location": "Goa", "price": 8000, "rating": 4.0,
+     "available_dates": ["December 2025"]},
+]
+
+
+def post(path, body, app=None):
+    """(status, json) of one POST against a fresh app over the fixture catalog."""
+    async def call():
+        recommender = TourismRecommender.from_packages(PACKAGES)
+        async with TestClient(TestServer(app or api_server.create_app(recommender=recommender))) as client:
+            response = await client.post(path, json=body)
+            return response.status, await response.json()
+    return asyncio.run(call())
+
+
+def test_bad_travel_window_dates_are_a_client_error():
+    status, body = post("/search", {"location": "Goa", "preferences": {"travel_window": ["2025-13-01", "2025-05-01"]}})
+    assert status == 400
+    assert "travel_window" in body["error"]
+
+
+def test_batch_entries_fail_on_their_own(monkeypatch):
+    def broken(recommender):
+        raise RuntimeError("facet store down")
+    monkeypatch.setattr(api_server, "facets", broken)
+
+    status, body = post("/batch", {"requests": [
+        {"op": "search", "location": "Goa", "preferences": {"travel_window": ["2025-04-01", "2025-04-30"]}},
+        {"op": "search", "location": "Goa", "preferences": {"travel_window": ["not a date", "2025-04-30"]}},
+        {"op": "facets"},
+        {"op": "teleport"},
+    ]})
+    assert status == 200
+    first, bad_date, crashed, unknown = body["responses"]
+    assert first["ok"] and [pkg["name"] for pkg in first["result"]["results"]] == ["Goa Beaches"]
+    assert not bad_date["ok"] and "travel_window" in bad_date["error"]
+    assert crashed == {"ok": False, "error": "Internal error."}
+    assert not unknown["ok"]
+
+
+def test_forecast_ignores_client_supplied_files(monkeypatch):
+    seen = []
+
+    class Predictor:
+        def predict(self, filename, place, start, steps=4, progress_callback=None, cancel_event=None):
+            seen.append(filename)
+            return [], [], [], {"lower": [], "upper": []}
+    monkeypatch.setattr("arima1.VisitorPredictor", Predictor)
+
+    status, _ = post("/forecast", {"place": "Goa", "start": "01-03-2025", "trends_file": "/etc/passwd"})
+    assert status == 200
+    assert seen == [api_server.TRENDS_FILE]
@@ -0,0 +1,24 @@
+import pytest
+
+from arima1 import VisitorPredictor, forecast_start_range
+
+TRENDS_FILE = "Google_Trends_past_5.csv"
+
+
+def test_start_dates_past_the_horizon_are_refused_with_the_valid_range():
+    # The export ends on 09-02-2025; a 4-week window may end at most MAX_HORIZON_WEEKS later
+    first, last = forecast_start_range("2025-02-09")
+    assert (f"{first:%d-%m-%Y}", f"{last:%d-%m-%Y}") == ("26-01-2025", "20-07-2025")
+    with pytest.raises(ValueError, match=f"can start between {first:%d-%m-%Y} and {last:%d-%m-%Y}"):
+        VisitorPredictor(seed=0).predict(TRENDS_FILE, "Hyderabad", "19-10-2026")
+    with pytest.raises(ValueError, match="can start between"):
+        VisitorPredictor(seed=0).predict(TRENDS_FILE, "Hyderabad", "01-01-2024")
+
+
+@pytest.mark.parametrize("place, start", [("Hyderabad", None), ("Hyderabad", "20-07-2025"),
+                                          ("Maha Kumbh", "16-02-2025")])
+def test_visitor_counts_and_bands_are_never_negative(place, start):
+    weeks, actual, predicted, bands = VisitorPredictor(seed=0).predict(TRENDS_FILE, place, start)
+    assert len(weeks) == 8
+    for values in (actual, predicted, bands["lower"], bands["upper"]):
+        assert min(values) >= 0
@@ -0,0 +1,44 @@
+from datetime import date
+
+from availability_index import AvailabilityIndex, package_months, window_slots
+
+PACKAGES = [
+    ["January 2020"],
+    ["March to May 2025"],
+    ["December 2039"],
+    ["Year-round"],
+    ["Ask the seller"],
+    ["June 2045"],
+]
+
+
+def test_windows_before_indexed_years_match_only_open_packages():
+    index = AvailabilityIndex(PACKAGES)
+    # Used to be clamped onto January 2020 and matched that package too
+    assert index.filter(None, "2019-01-01", "2019-12-31") == [4]
+    assert window_slots(date(2019, 1, 1), date(2019, 12, 31)) == 0
+
+
+def test_windows_after_indexed_years_match_only_open_packages():
+    index = AvailabilityIndex(PACKAGES)
+    # Used to be clamped onto December 2039
+    assert index.filter(None, "2041-02-01", "2041-03-01") == [4]
+    assert index.filter(None, "2045-06-01", "2045-06-30") == [4]
+
+
+def test_windows_overlapping_the_edges_keep_the_inside_part():
+    index = AvailabilityIndex(PACKAGES)
+    assert index.filter(None, "2019-11-01", "2020-01-31") == [0, 3, 4]
+    assert index.filter(None, "2039-12-01", "2040-02-01") == [2, 3, 4]
+
+
+def test_dates_outside_indexed_years_are_read_but_never_available():
+    assert package_months(["June 2045"]) == 0
+    assert package_months(["Until Dec 17, 2019"]) == 0
+    assert package_months(["Ask the seller"]) is None
+
+
+def test_windows_inside_indexed_years():
+    index = AvailabilityIndex(PACKAGES)
+    assert index.filter(None, date(2025, 4, 10), date(2025, 4, 20)) == [1, 3, 4]
+    assert index.filter([0, 1, 2], "2025-06-01", "2025-08-01") == []
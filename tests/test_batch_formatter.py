@@ -0,0 +1,15 @@
+import pytest
+
+from batch_formatter import build_catalog
+
+
+@pytest.mark.parametrize("make_input", [lambda tmp_path: tmp_path / "missing",
+                                        lambda tmp_path: tmp_path / "empty"])
+def test_no_input_pages_leave_the_catalog_alone(tmp_path, make_input):
+    (tmp_path / "empty").mkdir()
+    catalog = tmp_path / "tour_packages.json"
+    catalog.write_text('{"tour_packages": [{"name": "Goa Beaches"}]}')
+
+    with pytest.raises((FileNotFoundError, ValueError)):
+        build_catalog(str(make_input(tmp_path)), str(catalog), workers=1)
+    assert "Goa Beaches" in catalog.read_text()
@@ -0,0 +1,12 @@
+from calibration import load_scaling_table
+
+
+def test_thinly_fitted_factors_are_not_loaded(tmp_path):
+    table = tmp_path / "scaling_factors.csv"
+    table.write_text("Destination,Month,Scaling,Observations,Units\n"
+                     "Hyderabad,1,9172.8,8,raw\n"
+                     "Hyderabad,1,5443.3,2,normalized\n")
+
+    assert load_scaling_table(str(table)) == {("Hyderabad", 1): 9172.8}
+    assert load_scaling_table(str(table), units="normalized") == {}
+    assert load_scaling_table(str(table), units="normalized", min_observations=2) == {("Hyderabad", 1): 5443.3}
@@ -0,0 +1,33 @@
+from dedupe import DedupeIndex, collapse_results, dedupe_catalog
+
+TOUR = {
+    "name": "Magical Kerala Backwaters Houseboat Tour",
+    "location": ["Kochi", "Munnar", "Alleppey"],
+    "itinerary": {"Day 1": "Arrive Kochi - Fort Kochi walk", "Day 2": "Munnar - Tea gardens",
+                  "Day 3": "Alleppey - Overnight houseboat"},
+    "includes": "Hotel stay, breakfast, houseboat cruise, transfers",
+    "price": 24999,
+}
+
+
+def test_records_without_identity_text_are_kept():
+    records = [{"price": 1}, {"price": 2}, {"price": 3}]
+    assert collapse_results(records) == records
+    catalog, clusters = dedupe_catalog(records)
+    assert catalog == records
+    assert clusters == [[0], [1], [2]]
+
+
+def test_empty_records_do_not_join_real_clusters():
+    index = DedupeIndex()
+    assert index.add({"price": 1}) == (0, [])
+    assert index.add(dict(TOUR)) == (1, [])
+    assert index.add({"name": "", "location": []}) == (2, [])
+    assert index.add(dict(TOUR, price=23999)) == (3, [1])
+    assert index.clusters() == [[0], [1, 3], [2]]
+
+
+def test_near_duplicates_still_collapse():
+    cheaper = dict(TOUR, price=19999, rating=4.5)
+    results = collapse_results([dict(TOUR), {"price": 5}, cheaper])
+    assert results == [cheaper, {"price": 5}]
@@ -0,0 +1,77 @@
+import asyncio
+
+from fast_fetch import FastFetcher, html_to_text, needs_javascript, site_required_content
+from package_extractor import DURATION, PRICE
+
+DETAILS = "".join(f"<li>Day {day} - Sightseeing around Rishikesh and the ghats</li>" for day in range(1, 15))
+PACKAGE_PAGE = (
+    "<html><body><h1>Rishikesh Rafting Escape</h1>"
+    "<p>Seller : Yatra</p><p>Starting From Rs.12,499</p><p>3 Nights / 4 Days</p>"
+    f"<ul>{DETAILS}</ul><a class=\"readMore\" href=\"#\">More+</a></body></html>"
+).encode("utf-8")
+APP_SHELL = b'<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+
+
+def fetch(fetcher, url):
+    async def run():
+        async with fetcher.open_session() as session:
+            return await fetcher.fetch(session, url)
+    return asyncio.run(run())
+
+
+def make_fetcher(tmp_path, **options):
+    return FastFetcher(min_interval=0, timeout=5, cache_dir=str(tmp_path / "cache"), **options)
+
+
+def test_static_package_page_skips_browser(fixture_server, tmp_path):
+    fixture_server.pages["/package"] = (200, {"Content-Type": "text/html; charset=utf-8"}, PACKAGE_PAGE)
+    result, needs_browser = fetch(make_fetcher(tmp_path, required_content=(PRICE, DURATION)),
+                                  fixture_server.url("/package"))
+    assert result.ok() and result.source == "http"
+    assert "Starting From Rs.12,499" in result.text
+    # The "More+" link is on every Yatra page and must not force a browser render
+    assert not needs_browser
+
+
+def test_pages_without_package_content_need_browser(fixture_server, tmp_path):
+    fixture_server.pages["/shell"] = (200, {"Content-Type": "text/html"}, APP_SHELL)
+    _, needs_browser = fetch(make_fetcher(tmp_path), fixture_server.url("/shell"))
+    assert needs_browser
+    long_but_empty = "<p>" + "Loading package details... " * 40 + "</p>"
+    assert needs_javascript(long_but_empty, html_to_text(long_but_empty), site_required_content(
+        "https://packages.yatra.com/holidays/intl/details.htm"))
+
+
+def test_required_content_is_per_site(fixture_server, tmp_path):
+    other_site = ("<html><body><h1>Kerala Backwaters</h1>"
+                  + "<p>Houseboat stay with local cuisine and village walks.</p>" * 12 + "</body></html>").encode("utf-8")
+    fixture_server.pages["/other"] = (200, {"Content-Type": "text/html"}, other_site)
+    # Yatra's price and duration labels are not expected on another site's static page
+    _, needs_browser = fetch(make_fetcher(tmp_path), fixture_server.url("/other"))
+    assert not needs_browser
+    _, needs_browser = fetch(make_fetcher(tmp_path, required_content=(PRICE,)), fixture_server.url("/other"))
+    assert needs_browser
+    assert site_required_content("https://www.yatra.com/x") == (PRICE, DURATION)
+    assert site_required_content("https://notyatra.com/x") == ()
+
+
+def test_undecodable_page_falls_back_to_browser(fixture_server, tmp_path):
+    fixture_server.pages["/latin1"] = (200, {"Content-Type": "text/html; charset=utf-8"}, b"<p>Caf\xe9 \xff\xfe</p>")
+    result, needs_browser = fetch(make_fetcher(tmp_path), fixture_server.url("/latin1"))
+    assert not result.ok()
+    assert needs_browser
+
+
+def test_cached_page_is_revalidated(fixture_server, tmp_path):
+    def conditional(headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'}, PACKAGE_PAGE
+
+    fixture_server.pages["/package"] = (200, {}, conditional)
+    fetcher = make_fetcher(tmp_path)
+    first, _ = fetch(fetcher, fixture_server.url("/package"))
+    second, needs_browser = fetch(fetcher, fixture_server.url("/package"))
+    assert (first.source, second.source) == ("http", "cache")
+    assert second.text == first.text
+    assert not needs_browser
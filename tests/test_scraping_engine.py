@@ -0,0 +1,108 @@
+import re
+import threading
+import urllib.request
+
+from selenium.common.exceptions import WebDriverException
+
+from scraping_engine import ScraperPool
+
+PAGE = b"<html><body><h1>Kerala Backwaters</h1><p>5 Nights / 6 Days</p></body></html>"
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeDriver:
+    """Stands in for a browser session by fetching pages over plain HTTP."""
+    instances = []
+
+    def __init__(self):
+        self.html = ""
+        self.quit_called = False
+        FakeDriver.instances.append(self)
+
+    def get(self, url):
+        with urllib.request.urlopen(url, timeout=5) as response:
+            self.html = response.read().decode("utf-8")
+
+    def execute_script(self, script, *args):
+        if "readyState" in script:
+            return "complete"
+        return len(self.html)
+
+    def find_elements(self, by, selector):
+        return []
+
+    def find_element(self, by, name):
+        return FakeElement(" ".join(re.sub(r"<[^>]+>", " ", self.html).split()))
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(**kwargs):
+    FakeDriver.instances = []
+    kwargs.setdefault("driver_factory", FakeDriver)
+    return ScraperPool(retry_delay=0, **kwargs)
+
+
+def acquire_within(pool, seconds=2):
+    """The next session from the pool, or None if acquire() is still blocked after `seconds`."""
+    got = []
+    thread = threading.Thread(target=lambda: got.append(pool.browsers.acquire()), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return got[0] if got else None
+
+
+def test_scrapes_pages_from_fixture_server(fixture_server):
+    fixture_server.pages["/a"] = (200, {"Content-Type": "text/html"}, PAGE)
+    fixture_server.pages["/b"] = (200, {"Content-Type": "text/html"}, PAGE)
+    with make_pool(workers=2) as pool:
+        results = list(pool.scrape([fixture_server.url("/a"), fixture_server.url("/b")]))
+    assert all(result.ok() for result in results)
+    assert all("Kerala" in result.text for result in results)
+    assert len(FakeDriver.instances) <= 2
+
+
+def test_parser_error_releases_driver(fixture_server):
+    fixture_server.pages["/a"] = (200, {}, PAGE)
+
+    class BrokenParser(ScraperPool):
+        def scrape_page(self, driver, url):
+            driver.get(url)
+            raise ValueError("unexpected page layout")
+
+    pool = BrokenParser(workers=1, retries=1, retry_delay=0, driver_factory=FakeDriver)
+    result = pool.scrape_url(fixture_server.url("/a"))
+    assert not result.ok()
+    assert "ValueError" in result.error
+    assert result.attempts == 2
+    # The only session went back to the pool instead of leaking
+    assert acquire_within(pool) is not None
+
+
+def test_browser_error_discards_session(fixture_server):
+    class Crashing(ScraperPool):
+        def scrape_page(self, driver, url):
+            raise WebDriverException("browser died")
+
+    pool = Crashing(workers=1, retries=1, retry_delay=0, driver_factory=FakeDriver)
+    FakeDriver.instances = []
+    result = pool.scrape_url(fixture_server.url("/a"))
+    assert "Browser error" in result.error
+    assert [driver.quit_called for driver in FakeDriver.instances] == [True, True]
+    assert acquire_within(pool) is not None
+
+
+def test_driver_factory_failure_is_reported():
+    def failing_factory():
+        raise RuntimeError("geckodriver not found")
+
+    pool = make_pool(workers=1, retries=1, driver_factory=failing_factory)
+    result = pool.scrape_url("http://127.0.0.1:9/")
+    assert not result.ok()
+    assert "geckodriver not found" in result.error
+    assert pool.browsers._created == 0
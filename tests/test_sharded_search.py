@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sharded_search import ShardedRecommender
+
+PACKAGES = [{"name": f"{place} Tour {n}", "location": place, "package_link": f"https://example.com/{place}/{n}",
+             "rating": 4.0} for place in ("Goa", "Kerala") for n in range(6)]
+
+
+def names(results):
+    return sorted(pkg.name for pkg in results)
+
+
+def test_dead_shard_is_restarted_without_leaving_stale_replies():
+    with ShardedRecommender(packages=PACKAGES, shards=2) as sharded:
+        assert all(sharded.shard_sizes)
+        goa = names(sharded.search_packages("Goa", {}))
+        kerala = names(sharded.search_packages("Kerala", {}))
+
+        process = sharded._workers[0].process
+        process.kill()
+        process.join()
+        with pytest.raises(RuntimeError, match="restarted"):
+            sharded.search_packages("Goa", {})
+
+        # The live shard's Goa reply was consumed; this must not come back as Kerala's answer
+        assert names(sharded.search_packages("Kerala", {})) == kerala
+        assert names(sharded.search_packages("Goa", {})) == goa
+
+
+def test_concurrent_queries_get_their_own_replies():
+    with ShardedRecommender(packages=PACKAGES, shards=2) as sharded:
+        expected = {place: names(sharded.search_packages(place, {})) for place in ("Goa", "Kerala")}
+
+        def query(i):
+            place = ("Goa", "Kerala")[i % 2]
+            return place, names(sharded.search_packages(place, {}))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for place, found in pool.map(query, range(200)):
+                assert found == expected[place]
@@ -0,0 +1,38 @@
+import threading
+import tracemalloc
+
+from tracing import Tracer, span
+
+
+def test_disabling_one_tracer_leaves_another_recording():
+    first, second = Tracer(), Tracer()
+    first.enable(memory=True)
+    second.enable(memory=True)
+    first.disable()
+    assert tracemalloc.is_tracing()
+
+    with second.active():
+        with span("forecast", place="Goa"):
+            pass
+    assert [trace.name for trace in second.traces] == ["forecast"]
+    assert second.traces[0].memory is not None
+    assert not first.traces
+
+    second.disable()
+    assert not tracemalloc.is_tracing()
+
+
+def test_bound_work_reports_to_its_tracer_from_another_thread():
+    session = Tracer(enabled=True)
+
+    def work():
+        with span("predict"):
+            pass
+
+    thread = threading.Thread(target=session.bind(work))
+    thread.start()
+    thread.join()
+    assert [trace.name for trace in session.traces] == ["predict"]
+
+    work()  # outside the bound call: the shared tracer is off, nothing recorded
+    assert len(session.traces) == 1
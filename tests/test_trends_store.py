@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from trends_store import TrendsStore, get_store
+
+
+def write_export(path, columns):
+    header = "Week," + ",".join(columns)
+    path.write_text(header + "\n01-01-2024," + ",".join("10" for _ in columns) + "\n"
+                    "08-01-2024," + ",".join("20" for _ in columns) + "\n")
+    return str(path)
+
+
+def test_slug_collisions_are_rejected_before_anything_is_written(tmp_path):
+    store = TrendsStore(str(tmp_path / "store"))
+    store.ingest(write_export(tmp_path / "first.csv", ["Goa"]))
+
+    with pytest.raises(ValueError, match="place=amer-fort"):
+        store.ingest(write_export(tmp_path / "clash.csv", ["Amer Fort", "Amer-Fort"]))
+    with pytest.raises(ValueError, match="'Goa'"):
+        store.ingest(write_export(tmp_path / "case.csv", ["GOA"]))
+
+    assert store.places() == ["Goa"]
+    assert not os.path.exists(tmp_path / "store" / "place=amer-fort")
+    assert store.query("Goa").tolist() == [10.0, 20.0]
+
+
+def test_shared_store_sees_exports_ingested_elsewhere(tmp_path):
+    root = str(tmp_path / "store")
+    shared = get_store(root)
+    assert get_store(root + os.sep) is shared
+
+    TrendsStore(root).ingest(write_export(tmp_path / "later.csv", ["Ooty"]))  # e.g. the ingest CLI
+    assert shared.frame("Ooty")["Ooty"].tolist() == [10.0, 20.0]
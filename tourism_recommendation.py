@@ -1,4 +1,19 @@
 import json
+from datetime import date
+
+from availability_index import AvailabilityIndex
+from dedupe import collapse_results
+from geo_index import GeoIndex, get_gazetteer
+from query_planner import CatalogStats, compile_preferences, explain_row
+from range_index import RangeIndex, intersect_ranges
+
+# Range preferences and the numeric package fields they constrain
+RANGE_FIELDS = {
+    "price_range": "price",
+    "duration_range": "duration",
+    "rating_range": "rating",
+    "group_size_range": "max_group_size"
+}
 
 class TourPackage:
     def __init__(self, data):
@@ -27,62 +42,281 @@ class TourPackage:
         self.cancellation_policy = data.get("cancellation_policy", {})
         self.terms_conditions = data.get("terms_conditions", [])
 
+    def to_dict(self):
+        """Plain catalog record for this package (JSON-serialisable)."""
+        return dict(vars(self))
+
 class TourismRecommender:
     def __init__(self, json_file):
         """Load JSON file and initialize tour packages."""
         with open(json_file, "r", encoding="utf-8") as file:
             data = json.load(file)
-            self.tour_packages = [TourPackage(pkg) for pkg in data["tour_packages"]]
+        self._load(data["tour_packages"])
+
+    @classmethod
+    def from_packages(cls, packages):
+        """Recommender over in-memory catalog records instead of a JSON file."""
+        recommender = cls.__new__(cls)
+        recommender._load(packages)
+        return recommender
+
+    def _load(self, packages):
+        self.tour_packages = [TourPackage(pkg) for pkg in packages]
+        self._unique_values = None
+        self._range_indexes = None
+        self._availability = None
+        self._geo = None
+        self._crowd = None
+        self._stats = None
+        self._positions = None
+
+    def add_packages(self, packages, replace=()):
+        """Add catalog records to the live catalog, dropping any packages they supersede.
+
+        The first new record takes the catalog position of the first superseded package and the
+        rest are appended, so indexes that are already built are updated in place. Dropping more
+        packages than are added shifts positions, so that case rebuilds the indexes on next use.
+        """
+        added = [TourPackage(pkg) for pkg in packages]
+        replace = list(replace)
+        if len(replace) > len(added):
+            dropped = {id(pkg) for pkg in replace}
+            self.tour_packages = [pkg for pkg in self.tour_packages if id(pkg) not in dropped] + added
+            self._invalidate_indexes()
+            return added
+        positions = [self._position_of(pkg) for pkg in replace]
+        positions += range(len(self.tour_packages), len(self.tour_packages) + len(added) - len(positions))
+        for pos, pkg in zip(positions, added):
+            self._index_package(pos, pkg)
+        self._unique_values = None
+        return added
+
+    def _position_of(self, package):
+        if self._positions is None:
+            self._positions = {id(pkg): pos for pos, pkg in enumerate(self.tour_packages)}
+        return self._positions[id(package)]
+
+    def _index_package(self, pos, pkg):
+        """Put `pkg` at catalog position `pos` (replacing the package there, or appending) and update built indexes."""
+        old = self.tour_packages[pos] if pos < len(self.tour_packages) else None
+        if old is not None:
+            self._unindex_package(pos, old)
+            self.tour_packages[pos] = pkg
+        else:
+            self.tour_packages.append(pkg)
+        if self._positions is not None:
+            self._positions[id(pkg)] = pos
+        if self._range_indexes is not None:
+            for field, index in self._range_indexes.items():
+                index.add(pos, getattr(pkg, field))
+        if self._availability is not None:
+            self._availability.set(pos, pkg.available_dates)
+        if self._geo is not None:
+            for _, lat, lon in get_gazetteer().resolve(pkg.location):
+                self._geo.add(pos, lat, lon)
+        if self._stats is not None:
+            self._stats.add(pkg)
+
+    def _unindex_package(self, pos, old):
+        if self._positions is not None:
+            self._positions.pop(id(old), None)
+        if self._range_indexes is not None:
+            for field, index in self._range_indexes.items():
+                index.remove(pos, getattr(old, field))
+        if self._geo is not None:
+            for _, lat, lon in get_gazetteer().resolve(old.location):
+                self._geo.remove(pos, lat, lon)
+        if self._stats is not None:
+            self._stats.remove(old)
+
+    def _invalidate_indexes(self):
+        """Forget lookups derived from the package list; they are rebuilt on next use."""
+        self._unique_values = None
+        self._range_indexes = None
+        self._availability = None
+        self._geo = None
+        self._stats = None
+        self._positions = None
+
+    def _get_stats(self):
+        """Catalog statistics the query planner uses to order filters."""
+        if self._stats is None:
+            self._stats = CatalogStats(self.tour_packages, self._get_range_indexes())
+        return self._stats
+
+    def _get_range_indexes(self):
+        if self._range_indexes is None:
+            self._range_indexes = {
+                field: RangeIndex([getattr(pkg, field) for pkg in self.tour_packages])
+                for field in RANGE_FIELDS.values()
+            }
+        return self._range_indexes
+
+    def range_bounds(self):
+        """{field: [min, max]} over the catalog for each range-indexed field; None if no package has a value."""
+        return {field: [index.keys[0], index.keys[-1]] if len(index) else None
+                for field, index in self._get_range_indexes().items()}
+
+    def range_query(self, **bounds):
+        """Packages, in catalog order, whose fields lie in inclusive (low, high) bounds, e.g. price=(5000, 15000).
+
+        Either bound may be None; packages with an unknown value never match a range.
+        """
+        indexes = self._get_range_indexes()
+        unknown = set(bounds) - set(indexes)
+        if unknown:
+            raise ValueError(f"No range index for {', '.join(sorted(unknown))}")
+        if not bounds:
+            return list(self.tour_packages)
+        return [self.tour_packages[pos] for pos in intersect_ranges(indexes, bounds)]
+
+    def _get_availability(self):
+        if self._availability is None:
+            self._availability = AvailabilityIndex([pkg.available_dates for pkg in self.tour_packages])
+        return self._availability
+
+    def available_between(self, start, end):
+        """Packages, in catalog order, available at some point in the travel window (dates or ISO strings).
 
-    def search_packages(self, location, preferences):
-        """Search and filter tour packages based on user preferences."""
+        Packages whose available dates cannot be read are included.
+        """
+        return [self.tour_packages[pos] for pos in self._get_availability().filter(None, start, end)]
+
+    def _get_geo(self):
+        if self._geo is None:
+            gazetteer = get_gazetteer()
+            self._geo = GeoIndex()
+            for pos, pkg in enumerate(self.tour_packages):
+                for _, lat, lon in gazetteer.resolve(pkg.location):
+                    self._geo.add(pos, lat, lon)
+        return self._geo
+
+    def _place_coordinates(self, place):
+        """(latitude, longitude) of a place name from the bundled gazetteer, or None."""
+        gazetteer = get_gazetteer()
+        coordinates = gazetteer.lookup(place)
+        if coordinates is None:
+            resolved = gazetteer.resolve(place)
+            coordinates = (resolved[0][1], resolved[0][2]) if resolved else None
+        return coordinates
+
+    def packages_near(self, place, radius_km=None, k=None):
+        """(package, distance_km) pairs, nearest first: those within radius_km, the k closest, or both.
+
+        `place` is a place name known to the gazetteer or a (latitude, longitude) pair.
+        """
+        if radius_km is None and k is None:
+            raise ValueError("packages_near needs radius_km, k or both")
+        coordinates = tuple(place) if isinstance(place, (tuple, list)) else self._place_coordinates(place)
+        if coordinates is None:
+            raise ValueError(f"Unknown place '{place}'")
+        geo = self._get_geo()
+        if k is not None:
+            hits = geo.nearest(*coordinates, k)
+            if radius_km is not None:
+                hits = [(pos, distance) for pos, distance in hits if distance <= radius_km]
+        else:
+            hits = sorted(geo.within(*coordinates, radius_km).items(), key=lambda item: (item[1], item[0]))
+        return [(self.tour_packages[pos], distance) for pos, distance in hits]
+
+    def _get_crowd(self):
+        """Precomputed crowd levels from crowd_index.py, or None if the index has not been built."""
+        if self._crowd is None:
+            # Imported here so loading the recommender does not pull in the forecasting stack
+            from crowd_index import CROWD_INDEX_FILE, CrowdIndex
+            try:
+                self._crowd = CrowdIndex.load(CROWD_INDEX_FILE)
+            except FileNotFoundError:
+                print(f"⚠️ {CROWD_INDEX_FILE} not found; run crowd_index.py to enable crowd filters.")
+                self._crowd = False
+        return self._crowd or None
+
+    def crowd_level(self, package, when=None):
+        """Expected crowd (100 = a usual week) at the package's busiest destination in the week of `when`."""
+        crowd = self._get_crowd()
+        if crowd is None:
+            return None
+        return crowd.level(crowd.rows_for_location(package.location), when or date.today())
+
+    def _apply_crowd(self, packages, preferences):
+        """Drop packages expected to be busier than max_crowd_level and/or order them quietest first."""
+        window = preferences.get("travel_window")
+        week = preferences.get("crowd_week") or (window[0] if window else date.today())
+        levels = [(self.crowd_level(pkg, week), pkg) for pkg in packages]
+        max_level = preferences.get("max_crowd_level")
+        if max_level:
+            # Packages without a forecast are kept
+            levels = [(level, pkg) for level, pkg in levels if level is None or level <= max_level]
+        if preferences.get("sort_by_crowd"):
+            levels.sort(key=lambda item: (item[0] is None, item[0] or 0))
+        return [pkg for _, pkg in levels]
+
+    def _candidate_positions(self, preferences):
+        """Catalog positions allowed by the indexed preferences, or None if none of them is set."""
+        bounds = {field: tuple(preferences[pref]) for pref, field in RANGE_FIELDS.items() if preferences.get(pref)}
+        positions = intersect_ranges(self._get_range_indexes(), bounds) if bounds else None
+        if preferences.get("travel_window"):
+            start, end = preferences["travel_window"]
+            positions = self._get_availability().filter(positions, start, end)
+        return positions
+
+    def search_packages(self, location, preferences, explain=None):
+        """Search and filter tour packages based on user preferences.
+
+        Pass a list as `explain` to receive one row per stage with the candidates it pruned.
+        """
         
         location_query = location.lower().strip()
         filtered_packages = []
 
+        # Range and travel-window preferences narrow the candidates through the indexes first
+        positions = self._candidate_positions(preferences)
+        if positions is None:
+            positions = range(len(self.tour_packages))
+        elif explain is not None:
+            explain.append(explain_row("indexes", len(self.tour_packages), len(positions)))
+
+        # Packages within near_km of the searched place also count as a location match
+        nearby = {}
+        if preferences.get("near_km"):
+            coordinates = self._place_coordinates(location_query)
+            if coordinates is not None:
+                nearby = self._get_geo().within(*coordinates, preferences["near_km"])
+
         # Step 1: Fix location matching
-        for pkg in self.tour_packages:
+        for pos in positions:
+            pkg = self.tour_packages[pos]
             package_locations = pkg.location if isinstance(pkg.location, list) else [pkg.location]
             
             # Ensure case-insensitive matching for each location
-            if any(location_query in loc.lower() for loc in package_locations):
+            if any(location_query in str(loc).lower() for loc in package_locations) or pos in nearby:
                 filtered_packages.append(pkg)
 
-        print(f"✅ Found {len(filtered_packages)} packages matching location '{location_query}'.")
-
-        # Step 2: Apply Additional Filters
-        results = []
-        for pkg in filtered_packages:
-            # Debugging Prints (Check Values Before Filtering)
-            print(f"\n🔍 Checking package: {pkg.name}")
-            print(f"📌 Price: {pkg.price}, Allowed Max Price: {preferences.get('max_price', float('inf'))}")
-            print(f"🕒 Duration: {pkg.duration}, Min Duration: {preferences.get('preferred_duration', 0)}")
-            print(f"🎯 Activities: {pkg.activities}, Required: {preferences.get('preferred_activities')}")
-            print(f"🏨 Accommodation: {pkg.accommodation_type}, Required: {preferences.get('accommodation_type')}")
-            print(f"🍽️ Meal Plan: {pkg.meal_plan}, Required: {preferences.get('meal_plan')}")
-            print(f"🚗 Transport: {pkg.transport_type}, Required: {preferences.get('transport_type')}")
-            print(f"👥 Group Size: {pkg.max_group_size}, Max Allowed: {preferences.get('max_group_size', float('inf'))}")
-            
-            # Apply filtering conditions with flexible checks
-            if (
-                (not preferences.get("max_price") or pkg.price <= preferences["max_price"])
-                and (not preferences.get("preferred_duration") or pkg.duration >= preferences["preferred_duration"])
-                and (not preferences.get("preferred_activities") or any(act in pkg.activities for act in preferences["preferred_activities"]))
-                and (not preferences.get("accommodation_type") or preferences["accommodation_type"] == "Any" or preferences["accommodation_type"] in pkg.accommodation_type)
-                and (not preferences.get("meal_plan") or preferences["meal_plan"] == "Any" or pkg.meal_plan == preferences["meal_plan"])
-                and (not preferences.get("transport_type") or preferences["transport_type"] == "Any" or preferences["transport_type"] in pkg.transport_type)
-                and (not preferences.get("difficulty_level") or preferences["difficulty_level"] == "Any" or pkg.difficulty_level == preferences["difficulty_level"])
-                and (not preferences.get("required_languages") or not pkg.language_support or any(lang in pkg.language_support for lang in preferences["required_languages"]))
-                and (not preferences.get("max_group_size") or pkg.max_group_size == 0 or pkg.max_group_size <= preferences["max_group_size"])
-                and (not preferences.get("min_rating") or pkg.rating == 0 or pkg.rating >= preferences["min_rating"])
-            ):
-                results.append(pkg)
+        if explain is not None:
+            explain.append(explain_row("location", len(positions), len(filtered_packages)))
+
+        # Step 2: Apply the remaining filters, compiled once and ordered by estimated selectivity
+        plan = compile_preferences(preferences, self._get_stats())
+        results = plan.filter(filtered_packages, explain)
         
-        print(f"✅ Final matched packages after filters: {len(results)}")
+        if preferences.get("max_crowd_level") or preferences.get("sort_by_crowd"):
+            before = len(results)
+            results = self._apply_crowd(results, preferences)
+            if explain is not None:
+                explain.append(explain_row("crowd", before, len(results)))
+
+        if preferences.get("collapse_duplicates"):
+            before = len(results)
+            results = collapse_results(results)
+            if explain is not None:
+                explain.append(explain_row("collapse_duplicates", before, len(results)))
+
         return results
 
     def get_unique_values(self):
         """Extract unique values from tour packages for filtering."""
+        if self._unique_values is not None:
+            return self._unique_values
         unique_values = {
             "activities": set(),
             "accommodation_types": set(),
@@ -99,4 +333,5 @@ class TourismRecommender:
             unique_values["difficulty_levels"].add(pkg.difficulty_level)
             unique_values["languages"].update(pkg.language_support)
 
-        return {key: sorted(list(value)) for key, value in unique_values.items()}
+        self._unique_values = {key: sorted(list(value)) for key, value in unique_values.items()}
+        return self._unique_values
@@ -0,0 +1,227 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+
+class Span:
+    def __init__(self, name, attrs):
+        """One timed stage; children are the stages it ran, in order."""
+        self.name = name
+        self.attrs = attrs
+        self.children = []
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.memory = None  # bytes allocated and still held at exit; None when memory tracing is off
+        self.error = None
+
+    @property
+    def label(self):
+        place = self.attrs.get("place")
+        return f"{self.name}[{place}]" if place else self.name
+
+    def self_time(self):
+        return max(0.0, self.wall - sum(child.wall for child in self.children))
+
+    def to_dict(self):
+        return {
+            "name": self.name, "attrs": self.attrs,
+            "wall_ms": round(self.wall * 1000, 3), "cpu_ms": round(self.cpu * 1000, 3),
+            "memory_kb": None if self.memory is None else round(self.memory / 1024, 1),
+            "error": self.error,
+            "children": [child.to_dict() for child in self.children]
+        }
+
+
+class _ActiveSpan:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.span = Span(name, attrs)
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        if stack:
+            stack[-1].children.append(self.span)
+        stack.append(self.span)
+        self._memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.wall = time.perf_counter() - self._wall
+        span.cpu = time.thread_time() - self._cpu
+        if self._memory is not None and tracemalloc.is_tracing():
+            span.memory = tracemalloc.get_traced_memory()[0] - self._memory
+        if exc_type is not None:
+            span.error = exc_type.__name__
+        stack = self.tracer._stack()
+        stack.pop()
+        if not stack:
+            self.tracer._finish(span)
+        return False
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+# tracemalloc is process-wide: it runs while any tracer wants memory deltas and stops with the last one
+_memory_lock = threading.Lock()
+_memory_users = 0
+_started_tracemalloc = False
+
+
+def _acquire_memory():
+    global _memory_users, _started_tracemalloc
+    with _memory_lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+        _memory_users += 1
+
+
+def _release_memory():
+    global _memory_users, _started_tracemalloc
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0 and _started_tracemalloc:
+            tracemalloc.stop()
+            _started_tracemalloc = False
+
+
+# The tracer spans on this thread report to, when not the shared one (see Tracer.active)
+_current = threading.local()
+
+
+class Tracer:
+    def __init__(self, enabled=False, keep=50):
+        """Collects nested stage timings per thread; keeps the last `keep` finished top-level traces."""
+        self.enabled = enabled
+        self.traces = deque(maxlen=keep)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory = False
+
+    def enable(self, memory=False):
+        """Start recording. Memory deltas need tracemalloc, which slows allocation-heavy code noticeably."""
+        if memory and not self._memory:
+            _acquire_memory()
+        elif not memory and self._memory:
+            _release_memory()
+        self._memory = memory
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self._memory:
+            _release_memory()
+            self._memory = False
+
+    def __del__(self):
+        if self._memory:
+            _release_memory()
+
+    @contextmanager
+    def active(self):
+        """Send spans opened on this thread to this tracer instead of the shared one."""
+        previous = getattr(_current, "tracer", None)
+        _current.tracer = self
+        try:
+            yield self
+        finally:
+            _current.tracer = previous
+
+    def bind(self, fn):
+        """`fn` wrapped to run under `active()`, for handing work to another thread."""
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with self.active():
+                return fn(*args, **kwargs)
+        return run
+
+    def clear(self):
+        with self._lock:
+            self.traces.clear()
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return _ActiveSpan(self, name, attrs)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span):
+        with self._lock:
+            self.traces.append(span)
+
+    def to_json(self, indent=2):
+        with self._lock:
+            traces = list(self.traces)
+        return json.dumps([span.to_dict() for span in traces], indent=indent)
+
+    def folded(self):
+        """Self time per stack in microseconds, one "a;b;c 1234" line each (flamegraph.pl / speedscope)."""
+        totals = {}
+        with self._lock:
+            traces = list(self.traces)
+
+        def walk(span, prefix):
+            path = f"{prefix};{span.label}" if prefix else span.label
+            totals[path] = totals.get(path, 0) + int(span.self_time() * 1e6)
+            for child in span.children:
+                walk(child, path)
+
+        for span in traces:
+            walk(span, "")
+        return "\n".join(f"{path} {micros}" for path, micros in totals.items() if micros > 0)
+
+    def rows(self):
+        """Flat (trace, depth, stage, place, wall_ms, cpu_ms, memory_kb) rows for tables."""
+        rows = []
+        with self._lock:
+            traces = list(self.traces)
+
+        def walk(span, trace, depth, place):
+            place = span.attrs.get("place", place)
+            rows.append({
+                "trace": trace, "stage": "  " * depth + span.name, "place": place,
+                "wall_ms": round(span.wall * 1000, 1), "cpu_ms": round(span.cpu * 1000, 1),
+                "memory_kb": None if span.memory is None else round(span.memory / 1024, 1),
+                "error": span.error
+            })
+            for child in span.children:
+                walk(child, trace, depth + 1, place)
+
+        for trace, span in enumerate(traces, start=1):
+            walk(span, trace, 0, None)
+        return rows
+
+
+# Shared by every forecasting module; TOURISM_TRACE=1 turns it on from the start.
+# Per-user recording (the Streamlit panel) uses its own Tracer through Tracer.active/bind.
+tracer = Tracer(enabled=os.environ.get("TOURISM_TRACE") == "1")
+
+
+def span(name, **attrs):
+    """`with span("fit_hw", place=name):` records a stage when tracing is on and costs ~nothing when off."""
+    current = getattr(_current, "tracer", None) or tracer
+    if not current.enabled:
+        return _NOOP
+    return _ActiveSpan(current, name, attrs)
+
@@ -0,0 +1,222 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from batch_formatter import write_json_atomic
+from catalog_builder import file_hash, load_json
+
+STORE_DIR = "trends_store"
+MANIFEST = "manifest.json"
+COLUMNS = ["Date", "Period", "Value", "Export"]
+DATE_FORMATS = (("%d-%m-%Y", "week"), ("%Y-%m-%d", "week"), ("%Y-%m", "month"))
+
+
+def place_slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "unnamed"
+
+
+def read_export(filename):
+    """A wide Trends export as long rows of Place, Date, Period ("week" or "month") and Value.
+
+    The first column holds the dates (dd-mm-YYYY, YYYY-mm-dd or YYYY-MM); every other column is
+    one place, named before any ": (Worldwide)" suffix.
+    """
+    wide = pd.read_csv(filename, dtype=str)
+    dates = wide.iloc[:, 0].str.strip()
+    for date_format, period in DATE_FORMATS:
+        parsed = pd.to_datetime(dates, format=date_format, errors="coerce")
+        if parsed.notna().mean() > 0.9:
+            break
+    else:
+        raise ValueError(f"Cannot read the dates in the first column of {filename}")
+    values = wide.iloc[:, 1:].rename(columns=lambda c: c.split(":")[0].strip())
+    values = values.apply(lambda column: pd.to_numeric(column.str.strip().replace("<1", "0.5"), errors="coerce"))
+    values["Date"] = parsed
+    long = values.melt(id_vars="Date", var_name="Place", value_name="Value").dropna(subset=["Date", "Value"])
+    long["Period"] = period
+    return long[["Place", "Date", "Period", "Value"]]
+
+
+class TrendsStore:
+    def __init__(self, root=STORE_DIR):
+        """Append-only long-format trends history under root/place=<slug>/year=<YYYY>.csv.
+
+        Every ingested export appends its rows with an increasing export number; when exports
+        overlap, the row from the latest export wins at read time (and for good after compact()).
+        """
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST)
+        self._manifest_stamp = None
+        self.manifest = {"exports": [], "places": {}}
+        self._refresh_manifest()
+        self._partitions = {}
+
+    def _refresh_manifest(self):
+        """Re-read the manifest if another process (e.g. the ingest CLI) has rewritten it."""
+        try:
+            stat = os.stat(self.manifest_path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp != self._manifest_stamp:
+            self.manifest = load_json(self.manifest_path, {"exports": [], "places": {}})
+            self._manifest_stamp = stamp
+
+    def places(self):
+        self._refresh_manifest()
+        return sorted(self.manifest["places"].values())
+
+    def _place_dir(self, place):
+        return os.path.join(self.root, f"place={place_slug(place)}")
+
+    def _partition(self, place, year):
+        return os.path.join(self._place_dir(place), f"year={year}.csv")
+
+    def years(self, place):
+        try:
+            names = os.listdir(self._place_dir(place))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[5:-4]) for name in names if name.startswith("year=") and name.endswith(".csv"))
+
+    def ingest(self, filename, force=False):
+        """Append one export; returns the number of rows written (0 if this exact file was already ingested)."""
+        self._refresh_manifest()
+        digest = file_hash(filename)
+        if not force and any(export["hash"] == digest for export in self.manifest["exports"]):
+            print(f"⚠️ {filename} was already ingested; skipping.")
+            return 0
+        rows = read_export(filename)
+        slugs = {}
+        for place in rows["Place"].unique():
+            slug = place_slug(place)
+            known = self.manifest["places"].get(slug) or slugs.get(slug)
+            if known is not None and known != place:
+                raise ValueError(f"'{place}' in {filename} would share the partition place={slug} with '{known}'; "
+                                 f"rename one of the columns.")
+            slugs[slug] = place
+        os.makedirs(self.root, exist_ok=True)
+        self.manifest["places"].update(slugs)
+        export = len(self.manifest["exports"]) + 1
+        rows["Export"] = export
+        for (place, year), part in rows.groupby(["Place", rows["Date"].dt.year]):
+            path = self._partition(place, year)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            new_file = not os.path.exists(path)
+            with open(path, "a", encoding="utf-8", newline="") as file:
+                part.assign(Date=part["Date"].dt.strftime("%Y-%m-%d"))[COLUMNS].to_csv(
+                    file, header=new_file, index=False)
+        self.manifest["exports"].append({"number": export, "file": os.path.basename(filename), "hash": digest,
+                                         "rows": len(rows), "ingested": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        write_json_atomic(self.manifest_path, self.manifest)
+        stat = os.stat(self.manifest_path)
+        self._manifest_stamp = (stat.st_mtime_ns, stat.st_size)
+        return len(rows)
+
+    def _read_partition(self, path):
+        """One partition, deduplicated; memoised until the file changes."""
+        stat = os.stat(path)
+        cached = self._partitions.get(path)
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+        frame = pd.read_csv(path, parse_dates=["Date"])
+        frame = frame.sort_values("Export", kind="stable").drop_duplicates(["Date", "Period"], keep="last")
+        self._partitions[path] = ((stat.st_mtime_ns, stat.st_size), frame)
+        return frame
+
+    def query(self, place, start=None, end=None, period="week"):
+        """Values for one place as a date-indexed Series, reading only the years in [start, end]."""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        years = [year for year in self.years(place)
+                 if (start is None or year >= start.year) and (end is None or year <= end.year)]
+        frames = [self._read_partition(self._partition(place, year)) for year in years]
+        frames = [frame[frame["Period"] == period] for frame in frames]
+        if not frames:
+            return pd.Series(dtype=float, name=place)
+        data = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            data = data[data["Date"] >= start]
+        if end is not None:
+            data = data[data["Date"] <= end]
+        return data.set_index("Date")["Value"].sort_index().rename(place)
+
+    def frame(self, place, start=None, end=None, period="week"):
+        """The same slice shaped like the wide exports (Week, <place>), for the forecasting modules."""
+        self._refresh_manifest()
+        if place_slug(place) not in self.manifest["places"]:
+            raise ValueError(f"Could not find data for '{place}'. Available places: {self.places()}")
+        series = self.query(place, start, end, period)
+        return pd.DataFrame({"Week": series.index, place: series.values})
+
+    def compact(self):
+        """Rewrite every partition with only the winning row per date; returns rows dropped."""
+        self._refresh_manifest()
+        dropped = 0
+        for slug in self.manifest["places"]:
+            place_dir = os.path.join(self.root, f"place={slug}")
+            names = sorted(os.listdir(place_dir)) if os.path.isdir(place_dir) else []
+            for name in [n for n in names if n.startswith("year=") and n.endswith(".csv")]:
+                path = os.path.join(place_dir, name)
+                with open(path, "r", encoding="utf-8") as file:
+                    before = sum(1 for _ in file) - 1
+                frame = self._read_partition(path).sort_values(["Period", "Date"])
+                fd, tmp_path = tempfile.mkstemp(dir=place_dir, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                    frame.assign(Date=frame["Date"].dt.strftime("%Y-%m-%d"))[COLUMNS].to_csv(file, index=False)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+                dropped += before - len(frame)
+        return dropped
+
+
+def get_store(root=STORE_DIR):
+    """One store per directory, so its partition memo and manifest are shared across forecasts."""
+    return _store(os.path.abspath(root))
+
+
+@lru_cache(maxsize=None)
+def _store(root):
+    return TrendsStore(root)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partitioned store of Google Trends history.")
+    parser.add_argument("--store", default=STORE_DIR, help="Store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Append wide Trends exports")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--force", action="store_true", help="Ingest files even if already seen")
+    query = commands.add_parser("query", help="Print one place's history")
+    query.add_argument("place")
+    query.add_argument("--start", help="First date (YYYY-mm-dd)")
+    query.add_argument("--end", help="Last date (YYYY-mm-dd)")
+    query.add_argument("--period", choices=["week", "month"], default="week")
+    commands.add_parser("compact", help="Drop superseded rows from every partition")
+    commands.add_parser("places", help="List stored places")
+    args = parser.parse_args(argv)
+
+    store = get_store(args.store)
+    if args.command == "ingest":
+        for filename in args.files:
+            rows = store.ingest(filename, force=args.force)
+            if rows:
+                print(f"✅ Ingested {rows} rows from {filename}")
+    elif args.command == "query":
+        series = store.query(args.place, args.start, args.end, args.period)
+        print(series.to_string())
+    elif args.command == "compact":
+        print(f"✅ Dropped {store.compact()} superseded rows")
+    else:
+        print("\n".join(store.places()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())